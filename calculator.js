@@ -203,7 +203,8 @@ class PendleCalculator {
             timeWeighting,
             fdvList,
             networkPointsTotal,
-            componentTvlScaling
+            componentTvlScaling,
+            pendleMarketsStartDay
         } = config;
 
         if (!userYtTokens || userYtTokens.length === 0) {
@@ -226,14 +227,22 @@ class PendleCalculator {
             const tvl = this.buildTvlPath(days, tvlMode, tvlInitial, tvlFinal, tvlAverage);
             avgTvl = tvl.reduce((a, b) => a + b, 0) / tvl.length;
             let networkPointsDaily;
+            // Day Pendle markets launched (0 = from the start); before it only direct holding earns
+            const pendleStartDay = Math.max(0, parseInt(pendleMarketsStartDay || 0));
 
             if (pendleMode === "simple") {
-                const pendleSharePath = this.buildPendleSharePath(
-                    days, pendleShareMode,
-                    pendleShareInitial || 0, pendleShareFinal || 0, pendleShareAverage
-                );
+                // Pendle share curve runs from the Pendle start day to the end of the program
+                const pendleSharePath = new Array(durationDays).fill(0);
+                if (pendleStartDay < durationDays) {
+                    const pendleDays = days.slice(pendleStartDay).map(d => d - pendleStartDay);
+                    this.buildPendleSharePath(
+                        pendleDays, pendleShareMode,
+                        pendleShareInitial || 0, pendleShareFinal || 0, pendleShareAverage
+                    ).forEach((share, i) => { pendleSharePath[pendleStartDay + i] = share; });
+                }
 
                 const netMultDaily = days.map((day, i) => {
+                    if (day < pendleStartDay) return baseMultiplierDirect;
                     return pendleSharePath[i] * baseMultiplierPendle +
                            (1.0 - pendleSharePath[i]) * baseMultiplierDirect;
                 });
@@ -268,7 +277,7 @@ class PendleCalculator {
                 const scalingMode = componentTvlScaling || "proportional";
 
                 networkPointsDaily = days.map((day, i) => {
-                    const basePoints = basePointsWithPendle;
+                    const basePoints = day < pendleStartDay ? basePointsDirectOnly : basePointsWithPendle;
                     
                     if (avgTvl > 0 && totalComponentTvl > 0) {
                         if (scalingMode === "proportional" || scalingMode === "share_based") {
@@ -346,8 +355,10 @@ class PendleCalculator {
                 }
             });
 
+            // An order that buys nothing is not spent
+            const spentUsd = userYt > 0 ? spendUsd : 0;
             totalUserWeightedContribution += userWeightedContribution;
-            totalSpentUsd += spendUsd;
+            totalSpentUsd += spentUsd;
 
             // For display purposes, also calculate user points (for TVL mode or display)
             const userPointsDaily = new Array(durationDays).fill(0);
@@ -368,7 +379,8 @@ class PendleCalculator {
 
             tokenResults.push({
                 name,
-                spend_usd: spendUsd,
+                spend_usd: spentUsd,
+                unfilled_usd: spendUsd - spentUsd,
                 entry_day: entryDay,
                 entry_price: entryPrice,
                 user_yt: userYt,
@@ -529,8 +541,109 @@ class PendleCalculator {
             pendle_share_effective: pendleShareEffective
         };
     }
+
+    // Parse a lookup table written by export_lookup_table() in the Python calculator
+    parseLookupTable(buffer) {
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+        if (magic !== "PTLT") {
+            throw new Error("Not a Pendle lookup table (bad magic)");
+        }
+        const version = view.getUint16(4, true);
+        if (version !== 1) {
+            throw new Error(`Unsupported lookup table version ${version}`);
+        }
+        const headerLength = view.getUint32(6, true);
+        const headerBytes = new Uint8Array(buffer, 10, headerLength);
+        const header = JSON.parse(new TextDecoder("utf-8").decode(headerBytes));
+        const dataOffset = 10 + headerLength + ((10 + headerLength) % 2);
+        const size = header.shape.reduce((a, b) => a * b, 1);
+        // Copy so the data is aligned regardless of the source buffer
+        const data = new Uint16Array(buffer.slice(dataOffset, dataOffset + size * 2));
+
+        const strides = new Array(header.shape.length).fill(1);
+        for (let i = header.shape.length - 2; i >= 0; i--) {
+            strides[i] = strides[i + 1] * header.shape[i + 1];
+        }
+        return { header, data, strides };
+    }
+
+    // Fetch and parse a lookup table (e.g. "lookup_table.bin")
+    async loadLookupTable(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Could not load lookup table: ${response.status}`);
+        }
+        this.lookupTable = this.parseLookupTable(await response.arrayBuffer());
+        return this.lookupTable;
+    }
+
+    // Bracketing grid index and interpolation fraction along one axis (clamped)
+    _axisPosition(axis, value) {
+        const values = axis.values;
+        const coord = axis.scale === "log" ? (v => Math.log(v)) : (v => v);
+        if (values.length === 1 || value <= values[0]) return [0, 0];
+        if (value >= values[values.length - 1]) return [values.length - 1, 0];
+        let lo = 0;
+        let hi = values.length - 1;
+        while (hi - lo > 1) {
+            const mid = (lo + hi) >> 1;
+            if (values[mid] <= value) lo = mid; else hi = mid;
+        }
+        const t = (coord(value) - coord(values[lo])) / (coord(values[hi]) - coord(values[lo]));
+        return [lo, t];
+    }
+
+    // Interpolated airdrop value per USD spent for one token; null if the YT cannot be bought
+    lookupValueMultiple(table, tokenIndex, entryDay, fdv, tvlLevel, multiplier) {
+        const { header, data, strides } = table;
+        const q = header.quantization;
+        const positions = [entryDay, fdv, tvlLevel, multiplier].map(
+            (v, i) => this._axisPosition(header.axes[i], v)
+        );
+        const base = tokenIndex * strides[0];
+
+        let logValue = 0;
+        for (let corner = 0; corner < 16; corner++) {
+            let weight = 1;
+            let offset = base;
+            for (let a = 0; a < 4; a++) {
+                const [idx, t] = positions[a];
+                const upper = (corner >> a) & 1;
+                if (upper && t === 0) { weight = 0; break; }
+                weight *= upper ? t : 1 - t;
+                offset += (idx + upper) * strides[a + 1];
+            }
+            if (weight === 0) continue;
+            const raw = data[offset];
+            if (raw === q.missing) return null;
+            logValue += weight * (q.min + raw * q.step);
+        }
+        return Math.exp(logValue);
+    }
+
+    // ROI of a set of positions [{token, entryDay, spendUsd, multiplier}] from a lookup table
+    lookupRoi(table, positions, fdv, tvlLevel = 1.0) {
+        let totalSpent = 0;
+        let totalValue = 0;
+        positions.forEach(pos => {
+            const tokenIndex = typeof pos.token === "number" ? pos.token : table.header.tokens.indexOf(pos.token);
+            if (tokenIndex < 0) {
+                throw new Error(`Token '${pos.token}' is not in the lookup table`);
+            }
+            const multiple = this.lookupValueMultiple(table, tokenIndex, pos.entryDay, fdv, tvlLevel, pos.multiplier);
+            totalSpent += pos.spendUsd;
+            totalValue += multiple === null ? 0 : pos.spendUsd * multiple;
+        });
+        return totalSpent > 0 ? (totalValue - totalSpent) / totalSpent : null;
+    }
 }
 
-// Make available globally for browser
-window.PendleCalculator = PendleCalculator;
+// Make available globally for browser, and as a module for Node (parity_check.js)
+if (typeof window !== "undefined") {
+    window.PendleCalculator = PendleCalculator;
+}
+if (typeof module !== "undefined" && module.exports) {
+    module.exports = PendleCalculator;
+}
 
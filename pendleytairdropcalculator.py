@@ -1,3 +1,13 @@
+import json
+import hashlib
+import heapq
+import os
+import pickle
+import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+
 import numpy as np
 
 try:
@@ -48,6 +58,8 @@ BASE_MULTIPLIER_DIRECT = 1.0           # Points multiplier for direct holding
 # Points calculation for each token:
 #   - YT on Pendle: TVL_YT_Pendle × mult_yt_pendle
 #   - Direct staking: TVL_direct × mult_direct
+# Multipliers (here, BASE_MULTIPLIER_* and "multiplier" in USER_YT_TOKENS) can also be
+# schedules over the program days, e.g. {"base": 5.0, "steps": [[30, 2.0]]} (see USER_YT_TOKENS)
 # Note: PTs (Principal Tokens) don't earn points, so they're not included
 
 # === COMPONENT TVL SCALING MODE ===
@@ -81,7 +93,9 @@ USER_YT_TOKENS = [
         "name": "yzUSD-YT",
         "initial_price": 0.03572,      # YT price at day 0
         "spend_usd": 1500,             # How much USD you're spending
-        "multiplier": 5.0,             # Your points multiplier
+        "multiplier": 5.0,             # Your points multiplier, or a schedule, e.g.
+                                       # {"base": 5.0, "steps": [["campaign_end", 2.0]],
+                                       #  "boosts": [{"start_day": 0, "end_day": 7, "factor": 2.0}]}
         "entry_day": 3,                # Day you enter (will be overridden in timing sweep)
         
         # Campaign settings
@@ -89,24 +103,87 @@ USER_YT_TOKENS = [
         "campaign_end_day": 9,         # When does campaign end? (only if campaign_enabled=True)
         
         # YT Price decay mode
-        "yt_price_mode": "linear_to_zero",  # Options: "linear_to_zero", "exp_to_zero", "stepwise_linear", "two_phase"
+        "yt_price_mode": "linear_to_zero",  # Options: "linear_to_zero", "exp_to_zero", "stepwise_linear", "two_phase", "amm_implied"
         "pre_mode": "flat",            # Before campaign ends (only if campaign_enabled=True)
         "post_mode": "exp_to_zero",    # After campaign ends (only if campaign_enabled=True)
         "post_discount": 0.30,         # Price drop at campaign end (only if campaign_enabled=True)
         "step_days": 7,                # Step size for stepwise_linear mode
+
+        # Pendle AMM pricing (only if yt_price_mode="amm_implied"; initial_price is then ignored)
+        # "implied_apy": 0.15,         # Implied APY: constant, {"initial": 0.2, "final": 0.1} or one value per day
+        # "maturity_day": 120,         # Program day the YT matures (points stop accruing at maturity)
+        # "underlying_price": 1.0,     # USD price of the underlying asset
+
+        # Pool liquidity for slippage. None = any size fills at the path price
+        "liquidity": None,             # e.g. {"pool_depth_usd": 2_000_000, "scalar_root": 15.0, "ln_fee_rate_root": 0.001}
+
+        # Scheduled entry (DCA). None = buy everything on entry_day
+        "entry_schedule": None,        # e.g. {"mode": "fixed_daily", "start_day": 0, "end_day": 20}
+                                       # Modes: "lump_sum", "fixed_daily", "front_loaded" (+ "decay"),
+                                       #        "price_trigger" (+ "threshold"), "custom" (+ "amounts")
     },
     # Add more tokens here if you have multiple YT positions
 ]
 
 # === TIME WEIGHTING ===
 TIME_WEIGHTING = True                  # True = early entry gets more points, False = all days equal
+                                       # Or a scheme: "linear", "flat", "exp_decay", "step_boost", "early_bird", "loyalty"
+                                       # Or with params: {"scheme": "exp_decay", "half_life_days": 20}
+                                       # Or a list of daily weights (one per day of the program)
 
 # === FDV SCENARIOS ===
 FDV_LIST = [20_000_000, 50_000_000, 100_000_000, 200_000_000, 500_000_000]
+FDV_DISTRIBUTION = None                # Probabilistic FDV instead of fixed points, e.g.:
+                                       #   {"kind": "lognormal", "median": 100_000_000, "sigma": 0.8}
+                                       #   {"kind": "loguniform", "low": 20_000_000, "high": 500_000_000}
+                                       #   {"kind": "empirical", "values": [...], "weights": [...]}
+                                       # Or fit_lognormal_fdv([...FDVs of comparable launches...])
 
 # === TIMING SWEEP SETTINGS ===
 RUN_TIMING_SWEEP = True                # Set to True to run timing sweep, False to skip
 ENTRY_DAYS_TO_TEST = None              # None = test all days, or list like [0, 5, 10, 15]
+TIMING_SWEEP_STREAMING = False         # True = summarise the sweep chunk by chunk (constant memory, no sweep_df)
+TIMING_SWEEP_CHECKPOINT_DIR = None     # e.g. "sweep_checkpoints": streaming sweep runs as resumable shards
+TIMING_SWEEP_SHARD_DAYS = 10           # Entry days per checkpointed shard
+TIMING_SWEEP_WORKERS = None            # Worker processes for checkpointed shards (None = all CPUs)
+
+# === SCHEDULE SWEEP SETTINGS ===
+RUN_SCHEDULE_SWEEP = False             # Rank DCA / scheduled entry plans for each YT token
+SCHEDULE_SWEEP_MODE = "fixed_daily"    # Options: "lump_sum", "fixed_daily", "front_loaded", "price_trigger"
+SCHEDULE_THRESHOLDS = None             # YT price thresholds to test (only for "price_trigger")
+
+# === POSITION SIZE SWEEP (slippage) ===
+POSITION_SIZES = None                  # e.g. [1_000, 10_000, 100_000]; needs a "liquidity" pool on the YT token
+
+# === PORTFOLIO SETTINGS (many points programs at once) ===
+# Each program overrides any of the global parameters above (tvl_mode, duration_days, ...)
+# and must define its own user_yt_tokens and fdv_list (one FDV per scenario).
+# Example:
+#   {
+#       "name": "ProtocolA",
+#       "start_date": "2026-11-01",        # Calendar date of the program's day 0
+#       "total_supply": 1_000_000_000,
+#       "duration_days": 90,
+#       "pendle_mode": "by_tokens",
+#       "token_configs": [...],            # Same format as TOKEN_CONFIGS
+#       "user_yt_tokens": [...],           # Same format as USER_YT_TOKENS ("entry_date" also accepted)
+#       "fdv_list": [50_000_000, 200_000_000, 500_000_000],
+#   }
+PORTFOLIO_PROGRAMS = []
+PORTFOLIO_FDV_SCENARIOS = ["bear", "base", "bull"]   # Names for each fdv_list position
+
+# === CALIBRATION (fit TVL path + multipliers to leaderboard data) ===
+CALIBRATION_NETWORK_POINTS = None      # Observed cumulative network points by day, e.g. {9: 1.1e8, 19: 2.4e8}
+CALIBRATION_WALLETS = []               # Wallets with known holdings and points, e.g.
+#   {"token": "yzUSD", "venue": "yt_pendle", "balance_usd": 50_000, "entry_day": 0, "points": {19: 5_000_000}}
+
+# === WEB EXPORT SETTINGS ===
+EXPORT_WEB_TABLES = False              # Write lookup table + parity corpus for the website
+WEB_LOOKUP_TABLE_PATH = "website/lookup_table.bin"
+WEB_GOLDEN_CORPUS_PATH = "website/golden_corpus.json"
+WEB_FDV_GRID = np.geomspace(5_000_000, 5_000_000_000, 16)   # FDV axis of the lookup table
+WEB_TVL_LEVELS = np.geomspace(0.25, 4.0, 9)                  # TVL scale vs. configured scenario
+WEB_MULTIPLIER_GRID = [1, 1.5, 2, 3, 4, 5, 7.5, 10]          # User multiplier axis
 
 
 # =========================
@@ -270,9 +347,419 @@ def _build_yt_price_path(
     return price
 
 
-def simulate_airdrop_unified(
-    airdrop_pct,
-    total_supply,
+def _build_daily_path(days, spec, label="path"):
+    """Daily values from a constant, {"initial": a, "final": b} (linear) or one value per day."""
+    if isinstance(spec, dict):
+        return _build_pendle_share_path(
+            days, "linear", spec["initial"], spec.get("final", spec["initial"])
+        )
+    values = np.asarray(spec, dtype=float)
+    if values.ndim == 0:
+        return np.full(len(days), float(values))
+    if len(values) != len(days):
+        raise ValueError(f"{label} has {len(values)} values, expected {len(days)}")
+    return values
+
+
+def amm_yt_price_matrix(days, implied_apy, maturity_days, underlying_price=1.0):
+    """YT prices for many Pendle markets at once, shape (n_markets, n_days).
+
+    Pendle's AMM prices PT at an exchange rate of exp(ln(1 + implied APY) ×
+    years to maturity) underlying per PT, and PT + YT always redeem for one
+    unit of underlying, so YT = underlying_price × (1 - (1 + apy) ** -t).
+    implied_apy and underlying_price may be scalars, one value per market or
+    an (n_markets, n_days) path; maturity_days holds one maturity per market
+    in program days. YT is worth 0 from maturity on.
+    """
+    days = np.asarray(days, dtype=float)
+    maturity = np.atleast_1d(np.asarray(maturity_days, dtype=float))[:, None]
+
+    def per_market(values):
+        values = np.asarray(values, dtype=float)
+        return values[:, None] if values.ndim == 1 else values
+
+    apy = per_market(implied_apy)
+    underlying = per_market(underlying_price)
+    if np.any(apy <= -1):
+        raise ValueError("implied APY must be greater than -100%")
+
+    years_to_maturity = np.maximum(maturity - days[None, :], 0.0) / 365.0
+    pt_price = np.exp(-np.log1p(apy) * years_to_maturity)
+    return np.where(years_to_maturity > 0, underlying * (1.0 - pt_price), 0.0)
+
+
+def build_amm_market_tokens(days, markets):
+    """USER_YT_TOKENS entries for a whole market list, priced in one AMM call.
+
+    Each market is a USER_YT_TOKENS-style dict with implied_apy and
+    maturity_day (plus spend_usd, multiplier, ...). The returned copies carry
+    a precomputed "yt_prices" path, ready for any sweep.
+    """
+    apy = np.array([_build_daily_path(days, mk["implied_apy"], "implied_apy") for mk in markets])
+    prices = amm_yt_price_matrix(
+        days,
+        apy,
+        [mk.get("maturity_day", len(days)) for mk in markets],
+        np.array([float(mk.get("underlying_price", 1.0)) for mk in markets]),
+    )
+    return [dict(mk, yt_price_mode="amm_implied", yt_prices=row) for mk, row in zip(markets, prices)]
+
+
+# Pendle caps the PT share of a pool at 96% (MAX_MARKET_PROPORTION)
+_AMM_MAX_PT_PROPORTION = 0.96
+
+
+def _build_liquidity_pool(days, yt_prices, liquidity, maturity_day, underlying_price=1.0):
+    """Per-day Pendle AMM pool state consistent with a YT price path.
+
+    liquidity keys: pool_depth_usd (constant, {"initial", "final"} or one
+    value per day), scalar_root (default 15), ln_fee_rate_root (default
+    0.001), pt_proportion (PT share of the pool, default 0.5), and optional
+    maturity_day / underlying_price overrides. The rate anchor is chosen so
+    that the pool's marginal exchange rate reproduces yt_prices on each day.
+    """
+    underlying = float(liquidity.get("underlying_price", underlying_price))
+    maturity = liquidity.get("maturity_day", maturity_day)
+    depth = _build_daily_path(days, liquidity["pool_depth_usd"], "pool_depth_usd")
+    p0 = float(liquidity.get("pt_proportion", 0.5))
+    if not 0 < p0 < _AMM_MAX_PT_PROPORTION:
+        raise ValueError(f"pt_proportion must be between 0 and {_AMM_MAX_PT_PROPORTION}")
+
+    years_to_maturity = np.maximum(maturity - np.asarray(days, dtype=float), 0.0) / 365.0
+    pt_price = 1.0 - np.asarray(yt_prices, dtype=float) / underlying
+    tradable = (years_to_maturity > 0) & (yt_prices > 0) & (pt_price > 0) & (depth > 0)
+
+    exchange_rate = np.where(tradable, 1.0 / np.where(tradable, pt_price, 1.0), 1.0)
+    rate_scalar = float(liquidity.get("scalar_root", 15.0)) / np.where(tradable, years_to_maturity, 1.0)
+    rate_anchor = exchange_rate - np.log(p0 / (1.0 - p0)) / rate_scalar
+    fee_rate = np.exp(float(liquidity.get("ln_fee_rate_root", 0.001)) * years_to_maturity)
+
+    # Pool size in PT + asset units such that its USD value equals depth
+    size = depth / underlying / ((1.0 - p0) + p0 / exchange_rate)
+    return {
+        "tradable": tradable,
+        "underlying": underlying,
+        "total_pt": p0 * size,
+        "total_asset": (1.0 - p0) * size,
+        "rate_scalar": rate_scalar,
+        "rate_anchor": rate_anchor,
+        "fee_rate": fee_rate,
+    }
+
+
+def _token_liquidity_pool(days, token_cfg, yt_prices):
+    """Liquidity pool for a USER_YT_TOKENS entry, or None if it has no "liquidity"."""
+    liquidity = token_cfg.get("liquidity")
+    if not liquidity:
+        return None
+    return _build_liquidity_pool(
+        days, yt_prices, liquidity,
+        token_cfg.get("maturity_day", len(days)),
+        token_cfg.get("underlying_price", 1.0),
+    )
+
+
+def _amm_fill(spend_usd, pool, iterations=64):
+    """YT received for spend_usd on each day, vectorized over any leading axes.
+
+    Buying YT mints PT + YT from the underlying and sells the PT into the
+    pool. Pendle prices the whole PT sale at the exchange rate of the
+    post-trade PT proportion, ln(p / (1 - p)) / rate_scalar + rate_anchor,
+    net of fees, so the cost of d YT is d × (1 - 1 / (rate × fee)), which
+    grows monotonically in d and is inverted by bisection. Orders the pool
+    cannot absorb below its 96% PT cap receive 0 YT.
+    """
+    spend_asset = np.asarray(spend_usd, dtype=float) / pool["underlying"]
+    total_pt = pool["total_pt"]
+    total_liquidity = total_pt + pool["total_asset"]
+
+    def cost(pt_sold):
+        proportion = (total_pt + pt_sold) / total_liquidity
+        rate = np.log(proportion / (1.0 - proportion)) / pool["rate_scalar"] + pool["rate_anchor"]
+        return pt_sold * (1.0 - 1.0 / (rate * pool["fee_rate"]))
+
+    spend_asset, hi = np.broadcast_arrays(
+        spend_asset, _AMM_MAX_PT_PROPORTION * total_liquidity - total_pt
+    )
+    fillable = pool["tradable"] & (spend_asset > 0) & (cost(hi) >= spend_asset)
+    lo = np.zeros(spend_asset.shape)
+    hi = np.where(fillable, hi, 0.0)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        too_much = cost(mid) > spend_asset
+        hi = np.where(too_much, mid, hi)
+        lo = np.where(too_much, lo, mid)
+    return np.where(fillable, 0.5 * (lo + hi), 0.0)
+
+
+def _fill_yt(spend_usd, yt_prices, pool=None):
+    """YT received for spend_usd per day: at the path price, or through the AMM pool."""
+    if pool is not None:
+        return _amm_fill(spend_usd, pool)
+    spend = np.asarray(spend_usd, dtype=float)
+    prices = np.asarray(yt_prices, dtype=float)
+    out = np.zeros(np.broadcast(spend, prices).shape)
+    return np.divide(spend, prices, out=out, where=np.broadcast_to(prices > 0, out.shape))
+
+
+def _resolve_pendle_start_day():
+    """Day on which Pendle markets launched (0 if they existed from the start)."""
+    pendle_start_day = globals().get("PENDLE_MARKETS_START_DAY", None)
+    if pendle_start_day is None:
+        pendle_start_day = 0
+    return max(0, int(pendle_start_day))
+
+
+def _build_token_price_path(days, token_cfg):
+    """Build the YT price path for one entry of USER_YT_TOKENS."""
+    if token_cfg.get("yt_prices") is not None:
+        # Precomputed path, e.g. a row of amm_yt_price_matrix
+        yt_prices = np.asarray(token_cfg["yt_prices"], dtype=float)
+        if len(yt_prices) != len(days):
+            raise ValueError(f"yt_prices has {len(yt_prices)} values, expected {len(days)}")
+        return yt_prices
+
+    if token_cfg.get("yt_price_mode") == "amm_implied":
+        if token_cfg.get("campaign_enabled", False):
+            raise ValueError("yt_price_mode='amm_implied' cannot be combined with campaign_enabled")
+        apy_path = _build_daily_path(days, token_cfg["implied_apy"], "implied_apy")
+        return amm_yt_price_matrix(
+            days,
+            apy_path[None, :],
+            [token_cfg.get("maturity_day", len(days))],
+            token_cfg.get("underlying_price", 1.0),
+        )[0]
+
+    initial_price = token_cfg["initial_price"]
+    step_days = token_cfg.get("step_days", 7)
+
+    if token_cfg.get("campaign_enabled", False):
+        return _build_yt_price_path(
+            days,
+            mode="two_phase",
+            initial_price=initial_price,
+            campaign_enabled=True,
+            campaign_end_day=token_cfg.get("campaign_end_day"),
+            pre_mode=token_cfg.get("pre_mode", "flat"),
+            post_mode=token_cfg.get("post_mode", "linear_to_zero"),
+            post_discount=token_cfg.get("post_discount", 0.3),
+            step_days=step_days,
+        )
+    return _build_yt_price_path(
+        days,
+        mode=token_cfg.get("yt_price_mode", "linear_to_zero"),
+        initial_price=initial_price,
+        campaign_enabled=False,
+        step_days=step_days,
+    )
+
+
+def _weights_flat(days, duration_days):
+    """All days earn the same weight."""
+    return np.ones(len(days), dtype=float)
+
+
+def _weights_linear(days, duration_days):
+    """Weight decays linearly from 1 on day 0 to 0 at the end of the program."""
+    weights = (duration_days - days) / duration_days
+    return np.clip(weights, 0.0, 1.0)
+
+
+def _weights_exp_decay(days, duration_days, half_life_days=None):
+    """Weight halves every half_life_days (default: a quarter of the program)."""
+    if half_life_days is None:
+        half_life_days = max(duration_days / 4.0, 1.0)
+    return 0.5 ** (days / float(half_life_days))
+
+
+def _weights_step_boost(days, duration_days, boost=2.0, start_day=0, end_day=None):
+    """Points are multiplied by boost on days start_day..end_day (inclusive)."""
+    if end_day is None:
+        end_day = start_day + max(duration_days // 4, 1) - 1
+    return np.where((days >= start_day) & (days <= end_day), float(boost), 1.0)
+
+
+def _weights_early_bird(days, duration_days, window_days=None, bonus=1.5, base="flat"):
+    """Positions opened within the first window_days earn bonus on all their points."""
+    if window_days is None:
+        window_days = max(duration_days // 8, 1)
+    return {
+        "weights": _time_weight_table(duration_days, base)["weights"],
+        "entry_factor": np.where(days < window_days, float(bonus), 1.0),
+    }
+
+
+def _weights_loyalty(days, duration_days, ramp_days=30, max_boost=1.5, base="flat"):
+    """Holding multiplier ramps from 1 to max_boost over ramp_days of holding."""
+    held = np.minimum(days / max(float(ramp_days), 1.0), 1.0)
+    return {
+        "weights": _time_weight_table(duration_days, base)["weights"],
+        "hold_curve": 1.0 + (max_boost - 1.0) * held,
+    }
+
+
+# Time-weighting schemes by name. A scheme is called as fn(days, duration_days, **params)
+# and returns either the daily weight array, or a dict with "weights" plus optional
+# "entry_factor" (indexed by entry day) and "hold_curve" (indexed by days held).
+TIME_WEIGHTING_SCHEMES = {
+    "flat": _weights_flat,
+    "linear": _weights_linear,
+    "exp_decay": _weights_exp_decay,
+    "step_boost": _weights_step_boost,
+    "early_bird": _weights_early_bird,
+    "loyalty": _weights_loyalty,
+}
+
+_TIME_WEIGHT_TABLE_CACHE = OrderedDict()
+_TIME_WEIGHT_TABLE_CACHE_SIZE = 64
+
+
+def register_time_weighting(name, fn):
+    """Register (or replace) a time-weighting scheme usable as TIME_WEIGHTING."""
+    TIME_WEIGHTING_SCHEMES[name] = fn
+    _TIME_WEIGHT_TABLE_CACHE.clear()
+
+
+def _time_weighting_key(time_weighting):
+    """Hashable cache key for any accepted TIME_WEIGHTING value."""
+    if time_weighting is None or isinstance(time_weighting, (bool, np.bool_)):
+        return "linear" if time_weighting else "flat"
+    if isinstance(time_weighting, str):
+        return time_weighting
+    if isinstance(time_weighting, dict):
+        params = tuple(sorted(
+            (k, _time_weighting_key(v) if isinstance(v, (dict, list, np.ndarray)) else v)
+            for k, v in time_weighting.items()
+        ))
+        return ("scheme", params)
+    weights = np.asarray(time_weighting, dtype=float)
+    return ("array", weights.tobytes())
+
+
+def _time_weight_table(duration_days, time_weighting, end_day=None, multiplier_path=None):
+    """Weight vector and held-weight table for one scenario, computed once and cached.
+
+    held_weight[e] is the total weight a unit of YT earns when bought on day e
+    and held to the end of the program, so any entry-day lookup is O(1).
+    If end_day (e.g. YT maturity) falls inside the program, nothing accrues
+    from that day on. A daily multiplier_path (see _build_multiplier_path)
+    scales each day's weight, so held_weight then includes the multiplier.
+    Only the _TIME_WEIGHT_TABLE_CACHE_SIZE most recently used tables are kept,
+    so long sweeps over durations or multiplier paths stay bounded in memory.
+    """
+    if end_day is not None and end_day >= duration_days:
+        end_day = None
+    key = (int(duration_days), _time_weighting_key(time_weighting), end_day)
+    if multiplier_path is not None:
+        multiplier_path = np.asarray(multiplier_path, dtype=float)
+        key += (multiplier_path.tobytes(),)
+    table = _TIME_WEIGHT_TABLE_CACHE.get(key)
+    if table is not None:
+        _TIME_WEIGHT_TABLE_CACHE.move_to_end(key)
+        return table
+
+    days = np.arange(duration_days)
+    if isinstance(time_weighting, (str, dict, bool, np.bool_)) or time_weighting is None:
+        if isinstance(time_weighting, dict):
+            params = dict(time_weighting)
+            name = params.pop("scheme", "linear")
+        else:
+            name, params = _time_weighting_key(time_weighting), {}
+        if name not in TIME_WEIGHTING_SCHEMES:
+            raise ValueError(f"Unknown time weighting scheme '{name}'")
+        scheme = TIME_WEIGHTING_SCHEMES[name](days, duration_days, **params)
+    else:
+        scheme = np.asarray(time_weighting, dtype=float)
+        if len(scheme) != duration_days:
+            raise ValueError(
+                f"time_weighting array has {len(scheme)} values, expected {duration_days}"
+            )
+
+    if not isinstance(scheme, dict):
+        scheme = {"weights": scheme}
+    # Own copy: the table is frozen and cached, the caller's array must not be
+    weights = np.array(scheme["weights"], dtype=float)
+    if multiplier_path is not None:
+        weights = weights * multiplier_path
+    if end_day is not None:
+        weights[max(int(end_day), 0):] = 0.0
+
+    hold_curve = scheme.get("hold_curve")
+    if hold_curve is None:
+        held_weight = np.cumsum(weights[::-1])[::-1]
+    else:
+        # held_weight[e] = sum_h weights[e + h] * hold_curve[h]
+        full = np.correlate(weights, np.asarray(hold_curve, dtype=float), mode="full")
+        held_weight = full[len(weights) - 1:]
+    if scheme.get("entry_factor") is not None:
+        held_weight = held_weight * np.asarray(scheme["entry_factor"], dtype=float)
+
+    weights.setflags(write=False)
+    held_weight.setflags(write=False)
+    table = {"weights": weights, "held_weight": held_weight}
+    _TIME_WEIGHT_TABLE_CACHE[key] = table
+    if len(_TIME_WEIGHT_TABLE_CACHE) > _TIME_WEIGHT_TABLE_CACHE_SIZE:
+        _TIME_WEIGHT_TABLE_CACHE.popitem(last=False)
+    return table
+
+
+def _token_held_weight(duration_days, time_weighting, token_cfg):
+    """held_weight table for one user YT token (points stop at its maturity_day)."""
+    return _time_weight_table(duration_days, time_weighting, token_cfg.get("maturity_day"))["held_weight"]
+
+
+def _build_multiplier_path(days, spec, campaign_end_day=None):
+    """Points multiplier per day: a float if constant, else one value per day.
+
+    spec is a number, one value per day, or a dict:
+        {"base": 5.0,
+         "steps": [[20, 2.0]],                                  # from day 20 on: 2.0
+         "boosts": [{"start_day": 0, "end_day": 7, "factor": 2.0}]}
+    Step and boost days may be "campaign_end" (the token's campaign_end_day).
+    Boosts multiply whatever the steps give on [start_day, end_day).
+    """
+    if not isinstance(spec, dict):
+        values = np.asarray(spec, dtype=float)
+        if values.ndim == 0:
+            return float(values)
+        if len(values) != len(days):
+            raise ValueError(f"multiplier schedule has {len(values)} values, expected {len(days)}")
+        return values
+
+    def resolve(day):
+        if day == "campaign_end":
+            if campaign_end_day is None:
+                raise ValueError("campaign_end_day must be provided to use 'campaign_end' in a multiplier schedule")
+            return int(campaign_end_day)
+        return int(day)
+
+    path = np.full(len(days), float(spec.get("base", 1.0)))
+    for day, value in sorted((resolve(d), v) for d, v in spec.get("steps", [])):
+        path[days >= day] = float(value)
+    for boost in spec.get("boosts", []):
+        start = resolve(boost.get("start_day", 0))
+        end = resolve(boost.get("end_day", len(days)))
+        path[(days >= start) & (days < end)] *= float(boost["factor"])
+    return path
+
+
+def _token_point_weights(duration_days, time_weighting, token_cfg):
+    """(multiplier, held_weight) for one user YT token.
+
+    Points for YT bought on day e are user_yt × multiplier × held_weight[e].
+    With a multiplier schedule the multiplier is folded into held_weight
+    (a suffix sum of weight × multiplier), so the returned multiplier is 1.
+    """
+    multiplier = _build_multiplier_path(
+        np.arange(duration_days), token_cfg["multiplier"], token_cfg.get("campaign_end_day")
+    )
+    if np.ndim(multiplier) == 0:
+        return multiplier, _token_held_weight(duration_days, time_weighting, token_cfg)
+    table = _time_weight_table(duration_days, time_weighting, token_cfg.get("maturity_day"), multiplier)
+    return 1.0, table["held_weight"]
+
+
+def build_network_model(
     duration_days,
     tvl_mode,
     tvl_initial,
@@ -286,275 +773,56 @@ def simulate_airdrop_unified(
     base_multiplier_pendle,
     base_multiplier_direct,
     token_configs,
-    user_yt_tokens,
-    time_weighting,
-    fdv_list,
     network_points_total=None,
+    pendle_start_day=None,
+    component_tvl_scaling=None,
 ):
-    """Unified airdrop simulation supporting multiple YT tokens."""
-    if user_yt_tokens is None or len(user_yt_tokens) == 0:
-        raise ValueError("user_yt_tokens must contain at least one token configuration")
-    
-    # If network_points_total is provided, use it directly
-    # Otherwise, calculate from TVL and multipliers
-    if network_points_total is not None and network_points_total > 0:
-        network_points = float(network_points_total)
-        # Still calculate avg_tvl and pendle_share_effective for display purposes
+    """Build the protocol-side model: TVL path, daily network points and totals.
+
+    The result only depends on protocol parameters, so it can be built once and
+    shared by every user position, entry day and FDV evaluated against it.
+    pendle_start_day and component_tvl_scaling default to
+    PENDLE_MARKETS_START_DAY and COMPONENT_TVL_SCALING.
+    """
+    tvl_model = _build_tvl_model(duration_days, tvl_mode, tvl_initial, tvl_final, tvl_average)
+    return _build_network_points(
+        tvl_model, pendle_mode, pendle_share_initial, pendle_share_final,
+        pendle_share_mode, pendle_share_average,
+        base_multiplier_pendle, base_multiplier_direct,
+        token_configs, network_points_total, pendle_start_day, component_tvl_scaling,
+    )
+
+
+def _build_tvl_model(duration_days, tvl_mode, tvl_initial, tvl_final, tvl_average):
+    """Day grid and TVL path: the first stage of build_network_model."""
     days = np.arange(duration_days)
     tvl = _build_tvl_path(days, tvl_mode, tvl_initial, tvl_final, tvl_average)
-    avg_tvl = float(tvl.mean())
-    
-    if pendle_mode == "simple":
-        pendle_share_path = _build_pendle_share_path(
-            days, pendle_share_mode,
-            pendle_share_initial, pendle_share_final,
-            pendle_share_average
-        )
-            pendle_share_effective = float(pendle_share_path.mean())
-        elif pendle_mode == "by_tokens":
-            if not token_configs:
-                raise ValueError("token_configs must be provided when pendle_mode='by_tokens'")
-            
-            # Calculate effective Pendle share from token configs
-            total_tvl_pendle = 0.0
-            total_tvl_direct = 0.0
-            
-            for token_cfg in token_configs:
-                total_tvl_pendle += float(token_cfg.get("tvl_yt_pendle", 0))
-                total_tvl_direct += float(token_cfg.get("tvl_direct", 0))
-            
-            total_tvl_all = total_tvl_pendle + total_tvl_direct
-            pendle_share_effective = total_tvl_pendle / total_tvl_all if total_tvl_all > 0 else 0.0
-        else:
-            pendle_share_effective = 0.0
-    else:
-        # Calculate network points from TVL and multipliers
-        days = np.arange(duration_days)
-        tvl = _build_tvl_path(days, tvl_mode, tvl_initial, tvl_final, tvl_average)
-        avg_tvl = float(tvl.mean())
-        
-        if pendle_mode == "simple":
-            # Get when Pendle markets started
-            pendle_start_day = globals().get("PENDLE_MARKETS_START_DAY", None)
-            if pendle_start_day is None:
-                pendle_start_day = 0
-            pendle_start_day = max(0, int(pendle_start_day))
-            
-            # Build Pendle share path only for days when Pendle markets exist
-            # If Pendle starts later, the curve is calculated from Pendle start to end
-            pendle_share_path = np.zeros_like(days, dtype=float)
-            
-            if pendle_start_day < duration_days:
-                # Days when Pendle markets exist
-                pendle_days = days[pendle_start_day:]
-                if len(pendle_days) > 0:
-                    # Build share path relative to Pendle start (0 to duration of Pendle markets)
-                    pendle_share_values = _build_pendle_share_path(
-                        pendle_days - pendle_start_day,  # Relative days (0 to pendle_duration)
-                        pendle_share_mode,
-                        pendle_share_initial, pendle_share_final,
-                        pendle_share_average
-                    )
-                    pendle_share_path[pendle_start_day:] = pendle_share_values
-            
-            # Before Pendle markets start: only direct staking (Pendle share = 0)
-            # From Pendle start day onwards: use calculated Pendle share
-            net_mult_daily = np.zeros_like(days, dtype=float)
-            for i, day in enumerate(days):
-                if day < pendle_start_day:
-                    # Before Pendle: only direct staking
-                    net_mult_daily[i] = base_multiplier_direct
-                else:
-                    # After Pendle starts: weighted average
-                    net_mult_daily[i] = (
-                        pendle_share_path[i] * base_multiplier_pendle
-                        + (1.0 - pendle_share_path[i]) * base_multiplier_direct
-        )
-            
-        network_points_daily = tvl * net_mult_daily
-        pendle_share_effective = float(pendle_share_path.mean())
-    
-    elif pendle_mode == "by_tokens":
-        if not token_configs:
-            raise ValueError("token_configs must be provided when pendle_mode='by_tokens'")
-            
-            # Get when Pendle markets started (if None or 0, they exist from day 0)
-            pendle_start_day = globals().get("PENDLE_MARKETS_START_DAY", None)
-            if pendle_start_day is None:
-                pendle_start_day = 0
-            pendle_start_day = max(0, int(pendle_start_day))
-            
-            # Calculate network points from each token's components
-            # For each token: Points = (YT on Pendle × mult_yt_pendle) + (Direct × mult_direct)
-            # All TVL values are in USD, so points are also in USD terms
-            
-            base_points_direct_only = 0.0  # Points from direct staking only
-            base_points_with_pendle = 0.0  # Points from direct staking + Pendle YT
-            total_tvl_pendle = 0.0
-            total_tvl_direct = 0.0
-            
-            for token_cfg in token_configs:
-                tvl_yt_pendle = float(token_cfg.get("tvl_yt_pendle", 0))
-                tvl_direct = float(token_cfg.get("tvl_direct", 0))
-                mult_yt_pendle = float(token_cfg.get("mult_yt_pendle", base_multiplier_pendle))
-                mult_direct = float(token_cfg.get("mult_direct", base_multiplier_direct))
-                
-                # Direct staking points (available from day 0)
-                base_points_direct_only += tvl_direct * mult_direct
-                
-                # Points with Pendle (direct + Pendle YT)
-                base_points_with_pendle += tvl_yt_pendle * mult_yt_pendle
-                base_points_with_pendle += tvl_direct * mult_direct
-                
-                # Track TVL for Pendle share calculation
-                total_tvl_pendle += tvl_yt_pendle
-                total_tvl_direct += tvl_direct
-            
-            # Total component TVL (points-earning TVL, excludes PTs)
-            total_component_tvl = total_tvl_pendle + total_tvl_direct
-            
-            # Scale points based on COMPONENT_TVL_SCALING mode
-            scaling_mode = globals().get("COMPONENT_TVL_SCALING", "proportional")
-            
-            # Calculate points for each day
-            network_points_daily = np.zeros_like(tvl, dtype=float)
-            
-            for i, day in enumerate(days):
-                # Before Pendle markets start: only direct staking points
-                # From Pendle start day onwards: both direct + Pendle points
-                if day < pendle_start_day:
-                    base_points = base_points_direct_only
-                else:
-                    base_points = base_points_with_pendle
-                
-                # Scale by TVL if needed
-                if avg_tvl > 0 and total_component_tvl > 0:
-                    if scaling_mode == "proportional" or scaling_mode == "share_based":
-                        network_points_daily[i] = (tvl[i] / avg_tvl) * base_points
-                    elif scaling_mode == "constant":
-                        network_points_daily[i] = base_points
-                    else:
-                        network_points_daily[i] = (tvl[i] / avg_tvl) * base_points
-                else:
-                    network_points_daily[i] = base_points
-            
-            # Calculate effective Pendle share for display
-            total_tvl_all = total_tvl_pendle + total_tvl_direct
-            pendle_share_effective = total_tvl_pendle / total_tvl_all if total_tvl_all > 0 else 0.0
-    
-    else:
-        raise ValueError(f"Unknown pendle_mode '{pendle_mode}'")
-    
-    network_points = float(network_points_daily.sum())
-    
-    total_user_points = 0.0
-    total_spent_usd = 0.0
-    token_results = []
-    
-    for token_cfg in user_yt_tokens:
-        name = token_cfg.get("name", "YT")
-        initial_price = token_cfg["initial_price"]
-        spend_usd = token_cfg["spend_usd"]
-        multiplier = token_cfg["multiplier"]
-        entry_day = token_cfg.get("entry_day", 0)
-        
-        campaign_enabled = token_cfg.get("campaign_enabled", False)
-        yt_price_mode = token_cfg.get("yt_price_mode", "linear_to_zero")
-        step_days = token_cfg.get("step_days", 7)
-        
-        if campaign_enabled:
-            campaign_end_day = token_cfg.get("campaign_end_day")
-            pre_mode = token_cfg.get("pre_mode", "flat")
-            post_mode = token_cfg.get("post_mode", "linear_to_zero")
-            post_discount = token_cfg.get("post_discount", 0.3)
-            
-            yt_prices = _build_yt_price_path(
-                days,
-                mode="two_phase",
-                initial_price=initial_price,
-                campaign_enabled=True,
-                campaign_end_day=campaign_end_day,
-                pre_mode=pre_mode,
-                post_mode=post_mode,
-                post_discount=post_discount,
-                step_days=step_days,
-            )
-        else:
-            yt_prices = _build_yt_price_path(
-                days,
-                mode=yt_price_mode,
-                initial_price=initial_price,
-                campaign_enabled=False,
-                step_days=step_days,
-            )
-        
-        entry_price = yt_prices[entry_day]
-        user_yt = spend_usd / entry_price if entry_price > 0 else 0.0
-        
-        user_points_daily = np.zeros_like(days, dtype=float)
-        active_mask = days >= entry_day
-        base_daily_points = user_yt * multiplier
-        
-        if not time_weighting:
-            user_points_daily[active_mask] = base_daily_points
-        else:
-            weights = (duration_days - days) / duration_days
-            weights = np.clip(weights, 0.0, 1.0)
-            user_points_daily[active_mask] = base_daily_points * weights[active_mask]
-        
-        user_points = float(user_points_daily.sum())
-        total_user_points += user_points
-        total_spent_usd += spend_usd
-        
-        token_results.append({
-            "name": name,
-            "spend_usd": spend_usd,
-            "entry_day": entry_day,
-            "entry_price": float(entry_price),
-            "user_yt": float(user_yt),
-            "user_points": user_points,
-        })
-    
-    user_share = total_user_points / network_points if network_points > 0 else 0.0
-    airdrop_tokens = float(total_supply * airdrop_pct)
-    user_tokens = airdrop_tokens * user_share
-    
-    airdrop_values = {}
-    roi_per_fdv = {}
-    cost_vs_fdv = {}
-    for fdv in fdv_list:
-        token_price = fdv / total_supply
-        value = user_tokens * token_price
-        airdrop_values[fdv] = float(value)
-        roi_per_fdv[fdv] = (
-            (value - total_spent_usd) / total_spent_usd if total_spent_usd > 0 else None
-        )
-        cost_vs_fdv[fdv] = float(total_spent_usd / fdv)
-    
     return {
-        "user_points": total_user_points,
-        "network_points": network_points,
-        "user_share": user_share,
-        "airdrop_tokens": airdrop_tokens,
-        "user_tokens": user_tokens,
-        "total_spent_usd": total_spent_usd,
-        "token_results": token_results,
-        "airdrop_values": airdrop_values,
-        "roi_per_fdv": roi_per_fdv,
-        "cost_vs_fdv": cost_vs_fdv,
-        "avg_tvl": avg_tvl,
-        "pendle_share_effective": pendle_share_effective,
+        "days": days,
+        "duration_days": duration_days,
+        "tvl": tvl,
+        "avg_tvl": float(tvl.mean()) if len(tvl) > 0 else 0.0,
     }
 
 
-def timing_sweep_for_best_entry(
-    airdrop_pct,
-    total_supply,
-    duration_days,
-    tvl_mode,
-    tvl_initial,
-    tvl_final,
-    tvl_average,
+def _pendle_share_daily(days, pendle_start_day, mode, share_initial, share_final, share_average=None):
+    """Pendle share per program day: 0 before Pendle markets start."""
+    # Build Pendle share path only for days when Pendle markets exist
+    # If Pendle starts later, the curve is calculated from Pendle start to end
+    pendle_share_path = np.zeros_like(days, dtype=float)
+    if pendle_start_day < len(days):
+        pendle_days = days[pendle_start_day:]
+        pendle_share_path[pendle_start_day:] = _build_pendle_share_path(
+            pendle_days - pendle_start_day,  # Relative days (0 to pendle_duration)
+            mode,
+            share_initial, share_final,
+            share_average
+        )
+    return pendle_share_path
+
+
+def _build_network_points(
+    tvl_model,
     pendle_mode,
     pendle_share_initial,
     pendle_share_final,
@@ -563,252 +831,2088 @@ def timing_sweep_for_best_entry(
     base_multiplier_pendle,
     base_multiplier_direct,
     token_configs,
-    user_yt_tokens,
-    time_weighting,
-    fdv_list,
-    entry_days,
     network_points_total=None,
+    pendle_start_day=None,
+    component_tvl_scaling=None,
 ):
-    """Sweep entry days and compute ROI for each."""
-    if not PANDAS_AVAILABLE:
-        raise ImportError("pandas is required for timing_sweep_for_best_entry. Install with: pip install pandas")
-    
-    if user_yt_tokens is None or len(user_yt_tokens) == 0:
-        raise ValueError("user_yt_tokens must contain at least one token configuration")
-    
-    # Always create days array (needed for token price paths)
-    days = np.arange(duration_days)
-    
-    # If network_points_total is provided, use it directly
-    # Otherwise, calculate from TVL and multipliers
-    if network_points_total is not None and network_points_total > 0:
-        network_points = float(network_points_total)
-    else:
-        # Calculate network points from TVL and multipliers
-    tvl = _build_tvl_path(days, tvl_mode, tvl_initial, tvl_final, tvl_average)
-    
+    """Daily and total network points on top of a _build_tvl_model result."""
+    days = tvl_model["days"]
+    duration_days = tvl_model["duration_days"]
+    tvl = tvl_model["tvl"]
+    avg_tvl = tvl_model["avg_tvl"]
+    use_override = network_points_total is not None and network_points_total > 0
+    if pendle_start_day is None:
+        pendle_start_day = _resolve_pendle_start_day()
+    pendle_start_day = max(0, int(pendle_start_day))
+
+    network_points_daily = None
     if pendle_mode == "simple":
-            # Get when Pendle markets started
-            pendle_start_day = globals().get("PENDLE_MARKETS_START_DAY", None)
-            if pendle_start_day is None:
-                pendle_start_day = 0
-            pendle_start_day = max(0, int(pendle_start_day))
-            
-            # Build Pendle share path only for days when Pendle markets exist
-            pendle_share_path = np.zeros_like(days, dtype=float)
-            
-            if pendle_start_day < duration_days:
-                # Days when Pendle markets exist
-                pendle_days = days[pendle_start_day:]
-                if len(pendle_days) > 0:
-                    # Build share path relative to Pendle start
-                    pendle_share_values = _build_pendle_share_path(
-                        pendle_days - pendle_start_day,
-                        pendle_share_mode,
-            pendle_share_initial, pendle_share_final,
-            pendle_share_average
+        pendle_share_path = _pendle_share_daily(
+            days, pendle_start_day, pendle_share_mode,
+            pendle_share_initial, pendle_share_final, pendle_share_average,
         )
-                    pendle_share_path[pendle_start_day:] = pendle_share_values
-            
-            # Before Pendle markets start: only direct staking
-            # From Pendle start day onwards: use calculated Pendle share
-            net_mult_daily = np.zeros_like(days, dtype=float)
-            for i, day in enumerate(days):
-                if day < pendle_start_day:
-                    net_mult_daily[i] = base_multiplier_direct
-                else:
-                    net_mult_daily[i] = (
-                        pendle_share_path[i] * base_multiplier_pendle
-                        + (1.0 - pendle_share_path[i]) * base_multiplier_direct
+        pendle_share_effective = float(pendle_share_path.mean()) if len(days) > 0 else 0.0
+
+        base_multiplier_pendle = _build_multiplier_path(days, base_multiplier_pendle)
+        base_multiplier_direct = _build_multiplier_path(days, base_multiplier_direct)
+
+        # Before Pendle markets start: only direct staking (Pendle share = 0)
+        # From Pendle start day onwards: weighted average of both multipliers
+        net_mult_daily = np.where(
+            days < pendle_start_day,
+            base_multiplier_direct,
+            pendle_share_path * base_multiplier_pendle
+            + (1.0 - pendle_share_path) * base_multiplier_direct,
         )
         network_points_daily = tvl * net_mult_daily
-    
+
     elif pendle_mode == "by_tokens":
         if not token_configs:
             raise ValueError("token_configs must be provided when pendle_mode='by_tokens'")
-            
-            # Get when Pendle markets started (same logic as simulate_airdrop_unified)
-            pendle_start_day = globals().get("PENDLE_MARKETS_START_DAY", None)
-            if pendle_start_day is None:
-                pendle_start_day = 0
-            pendle_start_day = max(0, int(pendle_start_day))
-            
-            # Calculate network points from each token's components (same logic as simulate_airdrop_unified)
-            base_points_direct_only = 0.0
-            base_points_with_pendle = 0.0
-            total_component_tvl = 0.0
-            
-            for token_cfg in token_configs:
-                tvl_yt_pendle = float(token_cfg.get("tvl_yt_pendle", 0))
-                tvl_direct = float(token_cfg.get("tvl_direct", 0))
-                mult_yt_pendle = float(token_cfg.get("mult_yt_pendle", base_multiplier_pendle))
-                mult_direct = float(token_cfg.get("mult_direct", base_multiplier_direct))
-                
-                # Direct staking points (available from day 0)
-                base_points_direct_only += tvl_direct * mult_direct
-                
-                # Points with Pendle (direct + Pendle YT)
-                base_points_with_pendle += tvl_yt_pendle * mult_yt_pendle
-                base_points_with_pendle += tvl_direct * mult_direct
-                
-                # Track total component TVL
-                total_component_tvl += tvl_yt_pendle + tvl_direct
-            
-            avg_tvl = float(tvl.mean())
-            scaling_mode = globals().get("COMPONENT_TVL_SCALING", "proportional")
-            
-            # Calculate points for each day
-            network_points_daily = np.zeros_like(tvl, dtype=float)
-            
-            for i, day in enumerate(days):
-                # Before Pendle markets start: only direct staking points
-                # From Pendle start day onwards: both direct + Pendle points
-                if day < pendle_start_day:
-                    base_points = base_points_direct_only
-                else:
-                    base_points = base_points_with_pendle
-                
-                # Scale by TVL if needed
-                if avg_tvl > 0 and total_component_tvl > 0:
-                    if scaling_mode == "proportional" or scaling_mode == "share_based":
-                        network_points_daily[i] = (tvl[i] / avg_tvl) * base_points
-                    elif scaling_mode == "constant":
-                        network_points_daily[i] = base_points
-                    else:
-                        network_points_daily[i] = (tvl[i] / avg_tvl) * base_points
-                else:
-                    network_points_daily[i] = base_points
-    
-    else:
-        raise ValueError(f"Unknown pendle_mode '{pendle_mode}'")
-    
-    network_points = float(network_points_daily.sum())
-    
-    airdrop_tokens = float(total_supply * airdrop_pct)
-    
-    token_price_paths = []
-    token_multipliers = []
-    token_spend = []
-    
-    for token_cfg in user_yt_tokens:
-        initial_price = token_cfg["initial_price"]
-        spend_usd = token_cfg["spend_usd"]
-        multiplier = token_cfg["multiplier"]
-        
-        campaign_enabled = token_cfg.get("campaign_enabled", False)
-        yt_price_mode = token_cfg.get("yt_price_mode", "linear_to_zero")
-        step_days = token_cfg.get("step_days", 7)
-        
-        if campaign_enabled:
+
+        # For each token: Points = (YT on Pendle × mult_yt_pendle) + (Direct × mult_direct)
+        # All TVL values are in USD, so points are also in USD terms
+        base_points_direct_only = 0.0  # Points from direct staking only
+        base_points_with_pendle = 0.0  # Points from direct staking + Pendle YT
+        total_tvl_pendle = 0.0
+        total_tvl_direct = 0.0
+
+        for token_cfg in token_configs:
+            tvl_yt_pendle = float(token_cfg.get("tvl_yt_pendle", 0))
+            tvl_direct = float(token_cfg.get("tvl_direct", 0))
+            # Multipliers may be schedules, making the point sums daily arrays
             campaign_end_day = token_cfg.get("campaign_end_day")
-            pre_mode = token_cfg.get("pre_mode", "flat")
-            post_mode = token_cfg.get("post_mode", "linear_to_zero")
-            post_discount = token_cfg.get("post_discount", 0.3)
-            
-            yt_prices = _build_yt_price_path(
-                days,
-                mode="two_phase",
-                initial_price=initial_price,
-                campaign_enabled=True,
-                campaign_end_day=campaign_end_day,
-                pre_mode=pre_mode,
-                post_mode=post_mode,
-                post_discount=post_discount,
-                step_days=step_days,
+            mult_yt_pendle = _build_multiplier_path(
+                days, token_cfg.get("mult_yt_pendle", base_multiplier_pendle), campaign_end_day
             )
-        else:
-            yt_prices = _build_yt_price_path(
-                days,
-                mode=yt_price_mode,
-                initial_price=initial_price,
-                campaign_enabled=False,
-                step_days=step_days,
+            mult_direct = _build_multiplier_path(
+                days, token_cfg.get("mult_direct", base_multiplier_direct), campaign_end_day
             )
-        
-        token_price_paths.append(yt_prices)
-        token_multipliers.append(multiplier)
-        token_spend.append(spend_usd)
-    
-    total_spend = sum(token_spend)
-    
-    if entry_days is None:
-        entry_days = list(range(duration_days))
+
+            base_points_direct_only += tvl_direct * mult_direct
+            base_points_with_pendle += tvl_yt_pendle * mult_yt_pendle
+            base_points_with_pendle += tvl_direct * mult_direct
+
+            total_tvl_pendle += tvl_yt_pendle
+            total_tvl_direct += tvl_direct
+
+        # Total component TVL (points-earning TVL, excludes PTs)
+        total_component_tvl = total_tvl_pendle + total_tvl_direct
+        pendle_share_effective = (
+            total_tvl_pendle / total_component_tvl if total_component_tvl > 0 else 0.0
+        )
+
+        # Before Pendle markets start: only direct staking points
+        base_points = np.where(
+            days < pendle_start_day, base_points_direct_only, base_points_with_pendle
+        )
+
+        # Scale points based on COMPONENT_TVL_SCALING mode
+        scaling_mode = component_tvl_scaling
+        if scaling_mode is None:
+            scaling_mode = globals().get("COMPONENT_TVL_SCALING", "proportional")
+        if avg_tvl > 0 and total_component_tvl > 0 and scaling_mode != "constant":
+            network_points_daily = (tvl / avg_tvl) * base_points
+        else:
+            network_points_daily = base_points.astype(float)
+
+    elif use_override:
+        pendle_share_effective = 0.0
+    else:
+        raise ValueError(f"Unknown pendle_mode '{pendle_mode}'")
+
+    # If network_points_total is provided, use it directly
+    # Otherwise, use the points generated from TVL and multipliers
+    if use_override:
+        network_points = float(network_points_total)
+    else:
+        network_points = float(network_points_daily.sum())
+
+    return {
+        "days": days,
+        "duration_days": duration_days,
+        "tvl": tvl,
+        "avg_tvl": avg_tvl,
+        "network_points_daily": network_points_daily,
+        "network_points": network_points,
+        "pendle_share_effective": pendle_share_effective,
+    }
+
+
+def _schedule_matrix(days, mode, spend_usd, start_days, end_days, params=None, yt_prices=None):
+    """Spread spend_usd over days for a batch of schedules (one row per schedule).
+
+    start_days, end_days and params are equal-length arrays, one value per
+    schedule. params is the decay for "front_loaded" and the price threshold
+    for "price_trigger". Rows whose window never triggers a buy are all zero.
+    """
+    starts = np.asarray(start_days, dtype=float)[:, None]
+    ends = np.asarray(end_days, dtype=float)[:, None]
+    window = (days >= starts) & (days <= ends)
+
+    if mode == "lump_sum":
+        raw = (days == starts).astype(float)
+    elif mode == "fixed_daily":
+        raw = window.astype(float)
+    elif mode == "front_loaded":
+        decay = np.asarray(params, dtype=float)[:, None]
+        raw = np.where(window, decay ** np.maximum(days - starts, 0), 0.0)
+    elif mode == "price_trigger":
+        if yt_prices is None:
+            raise ValueError("yt_prices must be provided for schedule mode 'price_trigger'")
+        threshold = np.asarray(params, dtype=float)[:, None]
+        prices = np.asarray(yt_prices, dtype=float)
+        raw = (window & (prices > 0) & (prices <= threshold)).astype(float)
+    else:
+        raise ValueError(f"Unknown entry schedule mode '{mode}'")
+
+    totals = raw.sum(axis=1, keepdims=True)
+    return np.divide(raw * spend_usd, totals, out=np.zeros_like(raw), where=totals > 0)
+
+
+def _build_entry_schedule(days, spec, spend_usd, yt_prices=None):
+    """Build the USD-per-day purchase schedule for one "entry_schedule" spec."""
+    mode = spec.get("mode", "fixed_daily")
+    if mode == "custom":
+        amounts = np.zeros(len(days), dtype=float)
+        custom = np.asarray(spec["amounts"], dtype=float)[: len(days)]
+        amounts[: len(custom)] = custom
+        total = amounts.sum()
+        return amounts * spend_usd / total if total > 0 else amounts
+
+    start_day = spec.get("start_day", 0)
+    end_day = spec.get("end_day", start_day if mode == "lump_sum" else days[-1])
+    if mode == "price_trigger" and spec.get("threshold") is None:
+        raise ValueError("threshold must be provided for schedule mode 'price_trigger'")
+    param = spec.get("threshold") if mode == "price_trigger" else spec.get("decay", 0.8)
+    return _schedule_matrix(
+        days, mode, spend_usd, [start_day], [end_day], [param], yt_prices
+    )[0]
+
+
+def build_schedule_grid(
+    duration_days,
+    spend_usd,
+    mode="fixed_daily",
+    start_days=None,
+    end_days=None,
+    decays=(0.9, 0.8, 0.6),
+    thresholds=None,
+    yt_prices=None,
+):
+    """Build every candidate schedule for a grid of windows and parameters.
+
+    Returns (schedules, specs): a (n_schedules, duration_days) array of USD
+    spent per day and the matching list of "entry_schedule" spec dicts.
+    """
+    days = np.arange(duration_days)
+    start_days = days if start_days is None else np.asarray(start_days)
+    end_days = days if end_days is None else np.asarray(end_days)
+
+    if mode == "lump_sum":
+        starts, ends = start_days, start_days
+    else:
+        starts, ends = np.meshgrid(start_days, end_days, indexing="ij")
+        valid = ends >= starts
+        starts, ends = starts[valid], ends[valid]
+
+    if mode == "front_loaded":
+        param_values = np.asarray(decays, dtype=float)
+    elif mode == "price_trigger":
+        if thresholds is None:
+            raise ValueError("thresholds must be provided for schedule mode 'price_trigger'")
+        param_values = np.asarray(thresholds, dtype=float)
+    else:
+        param_values = np.array([np.nan])
+
+    starts = np.repeat(starts, len(param_values))
+    ends = np.repeat(ends, len(param_values))
+    params = np.tile(param_values, len(starts) // len(param_values))
+
+    schedules = _schedule_matrix(days, mode, spend_usd, starts, ends, params, yt_prices)
+
+    param_key = {"front_loaded": "decay", "price_trigger": "threshold"}.get(mode)
+    specs = []
+    for s, e, p in zip(starts, ends, params):
+        spec = {"mode": mode, "start_day": int(s), "end_day": int(e)}
+        if param_key is not None:
+            spec[param_key] = float(p)
+        specs.append(spec)
+    return schedules, specs
+
+
+def evaluate_entry_schedules(schedules, yt_prices, multiplier, held_weight, liquidity_pool=None):
+    """Evaluate a batch of purchase schedules against one YT price path.
+
+    YT bought on day d earns multiplier × held_weight[d] points (see
+    _time_weight_table), so total points are a dot product and every
+    schedule is evaluated in a single matrix product. With a liquidity_pool
+    each day's tranche fills through the AMM against that day's pool.
+    """
+    schedules = np.atleast_2d(np.asarray(schedules, dtype=float))
+    yt_daily = _fill_yt(schedules, yt_prices, liquidity_pool)
+    spend_daily = np.where(yt_daily > 0, schedules, 0.0)
+
+    cost = spend_daily.sum(axis=1)
+    user_yt = yt_daily.sum(axis=1)
+    user_points = multiplier * (yt_daily @ held_weight)
+    avg_price = np.divide(cost, user_yt, out=np.zeros_like(cost), where=user_yt > 0)
+
+    return {
+        "cost": cost,
+        "user_yt": user_yt,
+        "user_points": user_points,
+        "avg_price": avg_price,
+    }
+
+
+def _entry_day_positions(days, user_yt_tokens, time_weighting):
+    """Totals for USER_YT_TOKENS if every position is entered on day e, for every e.
+
+    Arrays named per entry day are indexed by e. A token that cannot be
+    bought on day e (zero YT price, or an order larger than its pool can
+    fill) is skipped for that day. yt_price_avg is the path (mid) price.
+    """
+    price_paths = np.array([_build_token_price_path(days, t) for t in user_yt_tokens], dtype=float)
+    spend = np.array([t["spend_usd"] for t in user_yt_tokens], dtype=float)
+    point_weights = [_token_point_weights(len(days), time_weighting, t) for t in user_yt_tokens]
+    multipliers = np.array([m for m, _ in point_weights], dtype=float)
+    held_weight = np.array([w for _, w in point_weights])
+    total_spend = float(spend.sum())
+
+    user_yt = np.array([
+        _fill_yt(t["spend_usd"], prices, _token_liquidity_pool(days, t, prices))
+        for t, prices in zip(user_yt_tokens, price_paths)
+    ])
+    tradable = user_yt > 0
+    tradable_prices = np.where(tradable, price_paths, 0.0)
+    if total_spend > 0:
+        yt_price_avg = (tradable_prices * spend[:, None]).sum(axis=0) / total_spend
+    else:
+        yt_price_avg = np.zeros(len(days), dtype=float)
+
+    return {
+        "price_paths": price_paths,
+        "spend": spend,
+        "total_spend": total_spend,
+        "user_yt_total": user_yt.sum(axis=0),
+        "user_points": (user_yt * multipliers[:, None] * held_weight).sum(axis=0),
+        "yt_price_avg": yt_price_avg,
+    }
+
+
+def simulate_airdrop_unified(
+    airdrop_pct,
+    total_supply,
+    duration_days,
+    tvl_mode,
+    tvl_initial,
+    tvl_final,
+    tvl_average,
+    pendle_mode,
+    pendle_share_initial,
+    pendle_share_final,
+    pendle_share_mode,
+    pendle_share_average,
+    base_multiplier_pendle,
+    base_multiplier_direct,
+    token_configs,
+    user_yt_tokens,
+    time_weighting,
+    fdv_list,
+    network_points_total=None,
+):
+    """Unified airdrop simulation supporting multiple YT tokens."""
+    if user_yt_tokens is None or len(user_yt_tokens) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    network = build_network_model(
+        duration_days, tvl_mode, tvl_initial, tvl_final, tvl_average,
+        pendle_mode, pendle_share_initial, pendle_share_final,
+        pendle_share_mode, pendle_share_average,
+        base_multiplier_pendle, base_multiplier_direct,
+        token_configs, network_points_total,
+    )
+    days = network["days"]
+    network_points = network["network_points"]
+
+    token_results = [
+        _simulate_user_token(days, duration_days, token_cfg, time_weighting)
+        for token_cfg in user_yt_tokens
+    ]
+    allocation = _allocate_airdrop(network_points, token_results, airdrop_pct, total_supply)
+    valuation = _value_airdrop(allocation, total_supply, fdv_list)
+
+    return {
+        "user_points": allocation["user_points"],
+        "network_points": network_points,
+        "user_share": allocation["user_share"],
+        "airdrop_tokens": allocation["airdrop_tokens"],
+        "user_tokens": allocation["user_tokens"],
+        "total_spent_usd": allocation["total_spent_usd"],
+        "token_results": token_results,
+        "airdrop_values": valuation["airdrop_values"],
+        "roi_per_fdv": valuation["roi_per_fdv"],
+        "cost_vs_fdv": valuation["cost_vs_fdv"],
+        "avg_tvl": network["avg_tvl"],
+        "pendle_share_effective": network["pendle_share_effective"],
+    }
+
+
+def _simulate_user_token(days, duration_days, token_cfg, time_weighting):
+    """Position of one USER_YT_TOKENS entry: YT bought, entry price and points.
+
+    Spend that buys nothing (zero YT price, or more than the pool can fill)
+    is not spent: it is left out of spend_usd and reported as unfilled_usd.
+    """
+    name = token_cfg.get("name", "YT")
+    spend_usd = token_cfg["spend_usd"]
+    entry_day = token_cfg.get("entry_day", 0)
+    yt_prices = _build_token_price_path(days, token_cfg)
+    multiplier, held_weight = _token_point_weights(duration_days, time_weighting, token_cfg)
+    pool = _token_liquidity_pool(days, token_cfg, yt_prices)
+
+    schedule_spec = token_cfg.get("entry_schedule")
+    if schedule_spec:
+        # Scheduled entry: spend is spread over several days
+        schedule = _build_entry_schedule(days, schedule_spec, spend_usd, yt_prices)
+        fill = evaluate_entry_schedules(schedule, yt_prices, multiplier, held_weight, pool)
+        spend_usd = float(fill["cost"][0])
+        user_yt = fill["user_yt"][0]
+        user_points = float(fill["user_points"][0])
+        entry_price = fill["avg_price"][0]
+        bought = np.nonzero(_fill_yt(schedule, yt_prices, pool) > 0)[0]
+        entry_day = int(bought[0]) if len(bought) > 0 else entry_day
+    else:
+        entry_price = yt_prices[entry_day]
+        if pool is None:
+            user_yt = spend_usd / entry_price if entry_price > 0 else 0.0
+        else:
+            # Effective fill price after price impact and fees
+            user_yt = float(_fill_yt(spend_usd, yt_prices, pool)[entry_day])
+            entry_price = spend_usd / user_yt if user_yt > 0 else 0.0
+        user_points = float(user_yt * multiplier * held_weight[entry_day])
+        if user_yt <= 0:
+            spend_usd = 0.0
+
+    return {
+        "name": name,
+        "spend_usd": spend_usd,
+        "unfilled_usd": float(token_cfg["spend_usd"] - spend_usd),
+        "entry_day": entry_day,
+        "entry_price": float(entry_price),
+        "user_yt": float(user_yt),
+        "user_points": user_points,
+    }
+
+
+def _token_spend_daily(days, token_cfg):
+    """USD actually spent on each day by one USER_YT_TOKENS entry (unfilled tranches excluded)."""
+    yt_prices = _build_token_price_path(days, token_cfg)
+    pool = _token_liquidity_pool(days, token_cfg, yt_prices)
+    schedule_spec = token_cfg.get("entry_schedule")
+    if schedule_spec:
+        spend = _build_entry_schedule(days, schedule_spec, token_cfg["spend_usd"], yt_prices)
+    else:
+        spend = np.zeros(len(days))
+        spend[token_cfg.get("entry_day", 0)] = token_cfg["spend_usd"]
+    return np.where(_fill_yt(spend, yt_prices, pool) > 0, spend, 0.0)
+
+
+def _allocate_airdrop(network_points, token_results, airdrop_pct, total_supply):
+    """User share of network points and the airdrop tokens it earns."""
+    total_user_points = 0.0
+    total_spent_usd = 0.0
+    for result in token_results:
+        total_user_points += result["user_points"]
+        total_spent_usd += result["spend_usd"]
+
+    user_share = total_user_points / network_points if network_points > 0 else 0.0
+    airdrop_tokens = float(total_supply * airdrop_pct)
+    return {
+        "user_points": total_user_points,
+        "total_spent_usd": total_spent_usd,
+        "user_share": user_share,
+        "airdrop_tokens": airdrop_tokens,
+        "user_tokens": airdrop_tokens * user_share,
+    }
+
+
+def _value_airdrop(allocation, total_supply, fdv_list):
+    """Airdrop value, ROI and cost/FDV ratio for each FDV scenario."""
+    user_tokens = allocation["user_tokens"]
+    total_spent_usd = allocation["total_spent_usd"]
+    airdrop_values = {}
+    roi_per_fdv = {}
+    cost_vs_fdv = {}
+    for fdv in fdv_list:
+        token_price = fdv / total_supply
+        value = user_tokens * token_price
+        airdrop_values[fdv] = float(value)
+        roi_per_fdv[fdv] = (
+            (value - total_spent_usd) / total_spent_usd if total_spent_usd > 0 else None
+        )
+        cost_vs_fdv[fdv] = float(total_spent_usd / fdv)
+    return {
+        "airdrop_values": airdrop_values,
+        "roi_per_fdv": roi_per_fdv,
+        "cost_vs_fdv": cost_vs_fdv,
+    }
+
+
+# Stages of simulate_airdrop_unified and the parameters each one reads.
+# "after" lists upstream stages; a stage is recomputed only if its own
+# parameters or an upstream stage changed. "token" runs once per entry of
+# user_yt_tokens and also reads that entry.
+SIMULATION_STAGES = {
+    "tvl": {
+        "params": ("duration_days", "tvl_mode", "tvl_initial", "tvl_final", "tvl_average"),
+        "after": (),
+    },
+    "network": {
+        "params": (
+            "pendle_mode", "pendle_share_initial", "pendle_share_final",
+            "pendle_share_mode", "pendle_share_average",
+            "base_multiplier_pendle", "base_multiplier_direct", "token_configs",
+            "network_points_total", "pendle_start_day", "component_tvl_scaling",
+        ),
+        "after": ("tvl",),
+    },
+    "token": {
+        "params": ("duration_days", "time_weighting"),
+        "after": (),
+    },
+    "allocation": {
+        "params": ("airdrop_pct", "total_supply"),
+        "after": ("network", "token"),
+    },
+    "valuation": {
+        "params": ("total_supply", "fdv_list"),
+        "after": ("allocation",),
+    },
+}
+
+
+def _freeze(value):
+    """Hashable, content-based key for a stage input (dicts, lists, arrays, scalars)."""
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((str(k), _freeze(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple(_freeze(v) for v in value))
+    if isinstance(value, np.ndarray):
+        return ("array", value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _run_stage(cache, stages, stage, key_parts, compute):
+    """Return (key, result) for one stage, computing it only on a cache miss."""
+    key = (stage, _freeze(key_parts))
+    if key in cache:
+        stages[stage] = "reused"
+    else:
+        cache[key] = compute()
+        stages[stage] = "computed"
+    return key, cache[key]
+
+
+def simulate_airdrop_staged(params, cache):
+    """simulate_airdrop_unified as a memoized stage graph, for what-if edits.
+
+    params holds the keyword arguments of simulate_airdrop_unified, plus
+    optional pendle_start_day and component_tvl_scaling (default: the module
+    globals at call time). cache is a dict kept by the caller between calls.
+    Each stage in SIMULATION_STAGES is keyed on its own parameters and the
+    keys of its upstream stages, so editing one FDV only reruns "valuation"
+    and editing one user token only reruns that token's stage and what
+    follows. Token stages are keyed on the time weights themselves, so a
+    scheme re-registered under the same name is recomputed. The result
+    matches simulate_airdrop_unified and adds "stages", mapping each stage
+    name ("token[i]" per user token) to "computed" or "reused".
+    """
+    params = dict(params)
+    params.setdefault("network_points_total", None)
+    if params.get("pendle_start_day") is None:
+        params["pendle_start_day"] = _resolve_pendle_start_day()
+    if params.get("component_tvl_scaling") is None:
+        params["component_tvl_scaling"] = globals().get("COMPONENT_TVL_SCALING", "proportional")
+    user_yt_tokens = params["user_yt_tokens"]
+    if user_yt_tokens is None or len(user_yt_tokens) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    stages = {}
+
+    def own(stage):
+        return tuple(params[name] for name in SIMULATION_STAGES[stage]["params"])
+
+    tvl_key, tvl_model = _run_stage(
+        cache, stages, "tvl", own("tvl"),
+        lambda: _build_tvl_model(*own("tvl")),
+    )
+    network_key, network = _run_stage(
+        cache, stages, "network", (own("network"), tvl_key),
+        lambda: _build_network_points(tvl_model, *own("network")),
+    )
+
+    # A scheme can be re-registered under the same name, so key on the weights it gives
+    weight_table = _time_weight_table(params["duration_days"], params["time_weighting"])
+    token_inputs = (own("token"), weight_table["weights"], weight_table["held_weight"])
+    token_keys = []
+    token_results = []
+    for i, token_cfg in enumerate(user_yt_tokens):
+        key, result = _run_stage(
+            cache, stages, f"token[{i}]", (token_inputs, token_cfg),
+            lambda token_cfg=token_cfg: _simulate_user_token(
+                np.arange(params["duration_days"]), params["duration_days"],
+                token_cfg, params["time_weighting"],
+            ),
+        )
+        token_keys.append(key)
+        token_results.append(result)
+
+    allocation_key, allocation = _run_stage(
+        cache, stages, "allocation", (own("allocation"), network_key, token_keys),
+        lambda: _allocate_airdrop(
+            network["network_points"], token_results,
+            params["airdrop_pct"], params["total_supply"],
+        ),
+    )
+    _, valuation = _run_stage(
+        cache, stages, "valuation", (own("valuation"), allocation_key),
+        lambda: _value_airdrop(allocation, params["total_supply"], params["fdv_list"]),
+    )
+
+    return {
+        "user_points": allocation["user_points"],
+        "network_points": network["network_points"],
+        "user_share": allocation["user_share"],
+        "airdrop_tokens": allocation["airdrop_tokens"],
+        "user_tokens": allocation["user_tokens"],
+        "total_spent_usd": allocation["total_spent_usd"],
+        "token_results": [dict(r) for r in token_results],
+        "airdrop_values": dict(valuation["airdrop_values"]),
+        "roi_per_fdv": dict(valuation["roi_per_fdv"]),
+        "cost_vs_fdv": dict(valuation["cost_vs_fdv"]),
+        "avg_tvl": network["avg_tvl"],
+        "pendle_share_effective": network["pendle_share_effective"],
+        "stages": stages,
+    }
+
+
+def _apply_sweep_overrides(base, overrides):
+    """Scenario parameters: base with overrides applied; unknown keys are rejected."""
+    unknown = sorted(set(overrides) - set(base))
+    if unknown:
+        raise ValueError(f"Unknown scenario override '{unknown[0]}'")
+    return dict(base, **overrides)
+
+
+def _iter_sweep_chunks(scenario, chunk_size, scenario_id=None):
+    """Yield column chunks of the timing sweep for one fully specified scenario."""
+    network = build_network_model(
+        scenario["duration_days"], scenario["tvl_mode"], scenario["tvl_initial"],
+        scenario["tvl_final"], scenario["tvl_average"], scenario["pendle_mode"],
+        scenario["pendle_share_initial"], scenario["pendle_share_final"],
+        scenario["pendle_share_mode"], scenario["pendle_share_average"],
+        scenario["base_multiplier_pendle"], scenario["base_multiplier_direct"],
+        scenario["token_configs"], scenario["network_points_total"],
+        scenario.get("pendle_start_day"), scenario.get("component_tvl_scaling"),
+    )
+    duration_days = scenario["duration_days"]
+    network_points = network["network_points"]
+    positions = _entry_day_positions(network["days"], scenario["user_yt_tokens"], scenario["time_weighting"])
+    total_spend = positions["total_spend"]
+    airdrop_tokens = float(scenario["total_supply"] * scenario["airdrop_pct"])
+    token_prices = np.asarray(scenario["fdv_list"], dtype=float) / scenario["total_supply"]
+    avg_prices = positions["yt_price_avg"]
+
+    entry_days = scenario["entry_days"]
+    if entry_days is None:
+        entry_days = range(duration_days)
+    entry_days = np.array([ed for ed in entry_days if 0 <= ed < duration_days], dtype=int)
+
+    n_fdv = len(token_prices)
+    for start in range(0, len(entry_days), chunk_size):
+        eds = entry_days[start:start + chunk_size]
+        avg_price = avg_prices[eds]
+        user_share = positions["user_points"][eds] / network_points if network_points > 0 else np.zeros(len(eds))
+        user_tokens = airdrop_tokens * user_share
+
+        airdrop_value = user_tokens[:, None] * token_prices[None, :]
+        if total_spend > 0:
+            roi = (airdrop_value - total_spend) / total_spend
+        else:
+            roi = np.full(airdrop_value.shape, np.nan)
+
+        can_break_even = (user_tokens[:, None] > 0) & (token_prices[None, :] > 0) & (avg_price[:, None] > 0)
+        breakeven_price = np.full(airdrop_value.shape, np.inf)
+        np.divide(total_spend * avg_price[:, None], airdrop_value, out=breakeven_price, where=can_break_even)
+
+        # Days from each entry day onwards whose average YT price is below breakeven
+        future = np.arange(duration_days)[None, :] >= eds[:, None]
+        cheap = (avg_prices[None, None, :] < breakeven_price[:, :, None]) & (avg_prices > 0)[None, None, :]
+        future_profitable_days = (cheap & future[:, None, :]).sum(axis=2)
+
+        chunk = {
+            "entry_day": np.repeat(eds, n_fdv),
+            "fdv": np.tile(np.asarray(scenario["fdv_list"]), len(eds)),
+            "yt_price_avg": np.repeat(avg_price, n_fdv),
+            "user_yt_total": np.repeat(positions["user_yt_total"][eds], n_fdv),
+            "user_share": np.repeat(user_share, n_fdv),
+            "user_tokens": np.repeat(user_tokens, n_fdv),
+            "airdrop_value": airdrop_value.ravel(),
+            "roi": roi.ravel(),
+            "breakeven_price": breakeven_price.ravel(),
+            "is_profitable": roi.ravel() > 0,
+            "future_profitable_days": future_profitable_days.ravel(),
+        }
+        if scenario_id is not None:
+            chunk["scenario"] = np.full(len(eds) * n_fdv, scenario_id)
+        yield chunk
+
+
+def iter_timing_sweep(
+    airdrop_pct,
+    total_supply,
+    duration_days,
+    tvl_mode,
+    tvl_initial,
+    tvl_final,
+    tvl_average,
+    pendle_mode,
+    pendle_share_initial,
+    pendle_share_final,
+    pendle_share_mode,
+    pendle_share_average,
+    base_multiplier_pendle,
+    base_multiplier_direct,
+    token_configs,
+    user_yt_tokens,
+    time_weighting,
+    fdv_list,
+    entry_days,
+    network_points_total=None,
+    chunk_size=256,
+    scenarios=None,
+    pendle_start_day=None,
+    component_tvl_scaling=None,
+):
+    """Generator version of timing_sweep_for_best_entry with bounded memory.
+
+    Yields dicts of equal-length column arrays covering at most chunk_size
+    entry days each, with rows in the same (entry_day, fdv) order as
+    timing_sweep_for_best_entry. scenarios is an optional iterable of
+    overrides of this function's parameters (e.g. {"tvl_average": 50_000_000}
+    or {"pendle_start_day": 30}); each is swept in turn and its chunks carry
+    a "scenario" column with its position. Unknown override keys raise
+    ValueError. pendle_start_day and component_tvl_scaling default to
+    PENDLE_MARKETS_START_DAY and COMPONENT_TVL_SCALING.
+    Feed the chunks to reduce_timing_sweep to summarise any grid size.
+    """
+    if user_yt_tokens is None or len(user_yt_tokens) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    base = {
+        "airdrop_pct": airdrop_pct,
+        "total_supply": total_supply,
+        "duration_days": duration_days,
+        "tvl_mode": tvl_mode,
+        "tvl_initial": tvl_initial,
+        "tvl_final": tvl_final,
+        "tvl_average": tvl_average,
+        "pendle_mode": pendle_mode,
+        "pendle_share_initial": pendle_share_initial,
+        "pendle_share_final": pendle_share_final,
+        "pendle_share_mode": pendle_share_mode,
+        "pendle_share_average": pendle_share_average,
+        "base_multiplier_pendle": base_multiplier_pendle,
+        "base_multiplier_direct": base_multiplier_direct,
+        "token_configs": token_configs,
+        "user_yt_tokens": user_yt_tokens,
+        "time_weighting": time_weighting,
+        "fdv_list": fdv_list,
+        "entry_days": entry_days,
+        "network_points_total": network_points_total,
+        "pendle_start_day": pendle_start_day,
+        "component_tvl_scaling": component_tvl_scaling,
+    }
+    if scenarios is None:
+        yield from _iter_sweep_chunks(base, chunk_size)
+        return
+    for scenario_id, overrides in enumerate(scenarios):
+        yield from _iter_sweep_chunks(_apply_sweep_overrides(base, overrides), chunk_size, scenario_id)
+
+
+def reduce_timing_sweep(chunks, top_k=5):
+    """Stream timing-sweep chunks into per-FDV summaries in constant memory.
+
+    Keeps a top_k heap by ROI, the count of profitable rows and the running
+    min/max of finite breakeven_price for every FDV. Returns
+    {fdv: {"top": [row dicts, best first], "profitable_days", "entry_days",
+    "breakeven_min", "breakeven_max"}}. Chunks with a "scenario" column
+    (iter_timing_sweep with scenarios) are summarised per scenario, keyed
+    by (scenario, fdv).
+    """
+    heaps = {}
+    summary = {}
+    seq = 0
+
+    for chunk in chunks:
+        fdvs = chunk["fdv"]
+        if "scenario" in chunk:
+            groups = np.unique(np.stack([chunk["scenario"], fdvs], axis=1), axis=0)
+        else:
+            groups = [(None, fdv) for fdv in np.unique(fdvs)]
+        for scenario_id, fdv in groups:
+            if scenario_id is None:
+                rows = np.nonzero(fdvs == fdv)[0]
+                key = fdv.item()
+            else:
+                rows = np.nonzero((chunk["scenario"] == scenario_id) & (fdvs == fdv))[0]
+                key = (int(scenario_id), fdv.item())
+            stats = summary.setdefault(key, {
+                "profitable_days": 0, "entry_days": 0,
+                "breakeven_min": np.inf, "breakeven_max": -np.inf,
+            })
+            stats["entry_days"] += len(rows)
+            stats["profitable_days"] += int(chunk["is_profitable"][rows].sum())
+            breakeven = chunk["breakeven_price"][rows]
+            breakeven = breakeven[np.isfinite(breakeven)]
+            if len(breakeven) > 0:
+                stats["breakeven_min"] = min(stats["breakeven_min"], float(breakeven.min()))
+                stats["breakeven_max"] = max(stats["breakeven_max"], float(breakeven.max()))
+
+            # Only the chunk's own top_k rows can enter the heap
+            roi = chunk["roi"][rows]
+            valid = rows[~np.isnan(roi)]
+            roi = chunk["roi"][valid]
+            if len(valid) > top_k:
+                keep = np.argpartition(-roi, top_k - 1)[:top_k]
+                valid, roi = valid[keep], roi[keep]
+
+            heap = heaps.setdefault(key, [])
+            for row, value in zip(valid, roi):
+                item = (float(value), -seq, {col: arr[row].item() for col, arr in chunk.items()})
+                seq += 1
+                if len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+
+    for key, stats in summary.items():
+        stats["top"] = [row for _, _, row in sorted(heaps.get(key, []), key=lambda it: it[:2], reverse=True)]
+    return summary
+
+
+def timing_sweep_for_best_entry(
+    airdrop_pct,
+    total_supply,
+    duration_days,
+    tvl_mode,
+    tvl_initial,
+    tvl_final,
+    tvl_average,
+    pendle_mode,
+    pendle_share_initial,
+    pendle_share_final,
+    pendle_share_mode,
+    pendle_share_average,
+    base_multiplier_pendle,
+    base_multiplier_direct,
+    token_configs,
+    user_yt_tokens,
+    time_weighting,
+    fdv_list,
+    entry_days,
+    network_points_total=None,
+):
+    """Sweep entry days and compute ROI for each."""
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for timing_sweep_for_best_entry. Install with: pip install pandas")
     
-    results = []
+    if user_yt_tokens is None or len(user_yt_tokens) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    chunks = iter_timing_sweep(
+        airdrop_pct, total_supply, duration_days, tvl_mode, tvl_initial, tvl_final,
+        tvl_average, pendle_mode, pendle_share_initial, pendle_share_final,
+        pendle_share_mode, pendle_share_average, base_multiplier_pendle,
+        base_multiplier_direct, token_configs, user_yt_tokens, time_weighting,
+        fdv_list, entry_days, network_points_total,
+    )
+    frames = [pd.DataFrame(chunk) for chunk in chunks]
+    if not frames:
+        raise ValueError("entry_days does not contain any day inside the points program")
+    df = pd.concat(frames, ignore_index=True)
+    df = df.set_index(["entry_day", "fdv"])
     
-    for ed in entry_days:
-        if ed < 0 or ed >= duration_days:
-            continue
-        
-        total_user_points = 0.0
-        total_yt_amount = 0.0
-        avg_price = 0.0
-        
-        for i, (yt_prices, mult, spend) in enumerate(zip(token_price_paths, token_multipliers, token_spend)):
-            price = yt_prices[ed]
-            if price <= 0:
-                continue
-            user_yt = spend / price
-            total_yt_amount += user_yt
-            avg_price += price * spend / total_spend
-            
-            user_points_daily = np.zeros_like(days, dtype=float)
-            active_mask = days >= ed
-            base_daily_points = user_yt * mult
-            
-            if not time_weighting:
-                user_points_daily[active_mask] = base_daily_points
-            else:
-                weights = (duration_days - days) / duration_days
-                weights = np.clip(weights, 0.0, 1.0)
-                user_points_daily[active_mask] = base_daily_points * weights[active_mask]
-            
-            total_user_points += float(user_points_daily.sum())
-        
-        user_share = total_user_points / network_points if network_points > 0 else 0.0
-        user_tokens = airdrop_tokens * user_share
-        
-        for fdv in fdv_list:
-            token_price = fdv / total_supply
-            airdrop_value = user_tokens * token_price
-            roi = (airdrop_value - total_spend) / total_spend if total_spend > 0 else None
-            
-            if user_tokens > 0 and token_price > 0 and avg_price > 0:
-                breakeven_price = total_spend / (user_tokens * token_price / avg_price)
+    return df
+
+
+def _sweep_shards(base, scenarios, scenarios_per_shard, days_per_shard):
+    """Split a sweep into shards of (scenario ids, their overrides, entry-day block)."""
+    if scenarios is None:
+        groups = [([None], [{}])]
+    else:
+        scenarios = list(scenarios)
+        groups = [
+            (list(range(i, min(i + scenarios_per_shard, len(scenarios)))),
+             scenarios[i:i + scenarios_per_shard])
+            for i in range(0, len(scenarios), scenarios_per_shard)
+        ]
+
+    shards = []
+    for ids, overrides in groups:
+        if base["entry_days"] is None:
+            max_days = max(_apply_sweep_overrides(base, o)["duration_days"] for o in overrides)
+            candidate_days = list(range(max_days))
+        else:
+            candidate_days = [int(d) for d in base["entry_days"]]
+        block = days_per_shard or max(len(candidate_days), 1)
+        for start in range(0, max(len(candidate_days), 1), block):
+            shards.append({
+                "scenario_ids": ids,
+                "overrides": overrides,
+                "entry_days": candidate_days[start:start + block],
+            })
+    return shards
+
+
+def _write_checkpoint(path, columns):
+    """Write a shard's columns to path atomically (temp file + rename)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _run_sweep_shard(base, shard, chunk_size, path):
+    """Worker: sweep one shard and checkpoint its rows to path."""
+    columns = {}
+    for scenario_id, overrides in zip(shard["scenario_ids"], shard["overrides"]):
+        scenario = _apply_sweep_overrides(base, overrides)
+        scenario["entry_days"] = shard["entry_days"]
+        for chunk in _iter_sweep_chunks(scenario, chunk_size, scenario_id):
+            for col, values in chunk.items():
+                columns.setdefault(col, []).append(values)
+    _write_checkpoint(path, {col: np.concatenate(parts) for col, parts in columns.items()})
+    return path
+
+
+def _shard_path(checkpoint_dir, shard_id):
+    return os.path.join(checkpoint_dir, f"shard-{shard_id:05d}.npz")
+
+
+def run_sharded_sweep(
+    sweep_params,
+    checkpoint_dir,
+    scenarios=None,
+    scenarios_per_shard=1,
+    days_per_shard=None,
+    workers=None,
+    chunk_size=256,
+):
+    """Run a timing sweep as resumable shards checkpointed under checkpoint_dir.
+
+    sweep_params holds the keyword arguments of timing_sweep_for_best_entry;
+    scenarios is an optional list of overrides as in iter_timing_sweep. The
+    work is split into shards of scenarios_per_shard scenarios × days_per_shard
+    entry days (None = all days), which a pool of `workers` local processes
+    (default: CPU count; 1 = run in this process) takes from a shared queue.
+    Each finished shard is written atomically, so after an interruption the
+    same call skips finished shards and only runs the rest. pendle_start_day
+    and component_tvl_scaling are pinned from the module globals when not
+    given, and together with the time-weighting tables they are part of the
+    sweep's fingerprint: rerunning with different parameters or settings in
+    the same directory raises ValueError.
+
+    Returns {"checkpoint_dir", "n_shards", "completed", "skipped"}; read the
+    results with iter_sharded_sweep or load_sharded_sweep.
+    """
+    base = dict(sweep_params)
+    base.setdefault("network_points_total", None)
+    base.setdefault("entry_days", None)
+    if base.get("user_yt_tokens") is None or len(base["user_yt_tokens"]) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    # Pin module-level settings now, so workers and resumed runs cannot drift
+    resolved = {
+        "pendle_start_day": _resolve_pendle_start_day(),
+        "component_tvl_scaling": globals().get("COMPONENT_TVL_SCALING", "proportional"),
+    }
+    for key, value in resolved.items():
+        if base.get(key) is None:
+            base[key] = value
+    if scenarios is not None:
+        scenarios = [
+            {key: resolved[key] if key in resolved and value is None else value
+             for key, value in overrides.items()}
+            for overrides in scenarios
+        ]
+        for overrides in scenarios:
+            _apply_sweep_overrides(base, overrides)
+
+    # Named time-weighting schemes are hashed by the weights they produce
+    weight_tables = []
+    for overrides in scenarios or [{}]:
+        scenario = _apply_sweep_overrides(base, overrides)
+        table = _time_weight_table(scenario["duration_days"], scenario["time_weighting"])
+        weight_tables.append((table["weights"], table["held_weight"]))
+
+    shards = _sweep_shards(base, scenarios, scenarios_per_shard, days_per_shard)
+    fingerprint = hashlib.sha256(
+        pickle.dumps(_freeze((base, scenarios, shards, chunk_size, weight_tables)))
+    ).hexdigest()
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest["fingerprint"] != fingerprint:
+            raise ValueError(
+                f"checkpoint_dir '{checkpoint_dir}' holds a different sweep; use a new directory"
+            )
+    else:
+        manifest = {"fingerprint": fingerprint, "n_shards": len(shards)}
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    pending = [
+        shard_id for shard_id in range(len(shards))
+        if not os.path.exists(_shard_path(checkpoint_dir, shard_id))
+    ]
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(pending) <= 1:
+        for shard_id in pending:
+            _run_sweep_shard(base, shards[shard_id], chunk_size, _shard_path(checkpoint_dir, shard_id))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = [
+                pool.submit(_run_sweep_shard, base, shards[shard_id], chunk_size,
+                            _shard_path(checkpoint_dir, shard_id))
+                for shard_id in pending
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+    return {
+        "checkpoint_dir": checkpoint_dir,
+        "n_shards": len(shards),
+        "completed": len(pending),
+        "skipped": len(shards) - len(pending),
+    }
+
+
+def iter_sharded_sweep(checkpoint_dir):
+    """Yield the checkpointed shards of run_sharded_sweep as sweep chunks, in shard order.
+
+    The chunks have the same columns as iter_timing_sweep and can be fed to
+    reduce_timing_sweep. Raises ValueError if any shard is still missing.
+    """
+    with open(os.path.join(checkpoint_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    paths = [_shard_path(checkpoint_dir, shard_id) for shard_id in range(manifest["n_shards"])]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        raise ValueError(
+            f"{len(missing)} of {len(paths)} shards are not finished; rerun run_sharded_sweep"
+        )
+    for path in paths:
+        with np.load(path, allow_pickle=False) as data:
+            chunk = {col: data[col] for col in data.files}
+        if chunk:
+            yield chunk
+
+
+def load_sharded_sweep(checkpoint_dir):
+    """Merge all checkpointed shards into one DataFrame.
+
+    Indexed like timing_sweep_for_best_entry by (entry_day, fdv), or by
+    (scenario, entry_day, fdv) when the sweep had scenarios.
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for load_sharded_sweep. Install with: pip install pandas")
+
+    frames = [pd.DataFrame(chunk) for chunk in iter_sharded_sweep(checkpoint_dir)]
+    if not frames:
+        raise ValueError("entry_days does not contain any day inside the points program")
+    df = pd.concat(frames, ignore_index=True)
+    keys = ["entry_day"] if "scenario" not in df else ["scenario", "entry_day"]
+    # Stable sort keeps each entry day's FDVs in fdv_list order
+    df = df.sort_values(keys, kind="stable", ignore_index=True)
+    return df.set_index(keys + ["fdv"])
+
+
+def schedule_sweep_for_token(
+    network_model,
+    token_cfg,
+    schedules,
+    schedule_specs,
+    airdrop_pct,
+    total_supply,
+    time_weighting,
+    fdv_list,
+):
+    """Rank candidate purchase schedules for one YT token in a single batch.
+
+    network_model comes from build_network_model; schedules/schedule_specs
+    come from build_schedule_grid. Returns one row per (schedule_id, fdv).
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for schedule_sweep_for_token. Install with: pip install pandas")
+
+    days = network_model["days"]
+    network_points = network_model["network_points"]
+    multiplier, held_weight = _token_point_weights(network_model["duration_days"], time_weighting, token_cfg)
+    yt_prices = _build_token_price_path(days, token_cfg)
+
+    fill = evaluate_entry_schedules(
+        schedules, yt_prices, multiplier, held_weight,
+        _token_liquidity_pool(days, token_cfg, yt_prices),
+    )
+    cost = fill["cost"]
+    user_share = fill["user_points"] / network_points if network_points > 0 else np.zeros_like(cost)
+    user_tokens = float(total_supply * airdrop_pct) * user_share
+
+    fdvs = np.asarray(fdv_list, dtype=float)
+    airdrop_value = user_tokens[:, None] * (fdvs / total_supply)[None, :]
+    roi = np.divide(
+        airdrop_value - cost[:, None], cost[:, None],
+        out=np.full_like(airdrop_value, np.nan), where=cost[:, None] > 0,
+    )
+
+    n_schedules = len(cost)
+    df = pd.DataFrame({
+        "schedule_id": np.repeat(np.arange(n_schedules), len(fdvs)),
+        "fdv": np.tile(fdv_list, n_schedules),
+        "mode": np.repeat([s.get("mode") for s in schedule_specs], len(fdvs)),
+        "start_day": np.repeat([s.get("start_day") for s in schedule_specs], len(fdvs)),
+        "end_day": np.repeat([s.get("end_day") for s in schedule_specs], len(fdvs)),
+        "param": np.repeat(
+            [s.get("decay", s.get("threshold", np.nan)) for s in schedule_specs], len(fdvs)
+        ),
+        "cost": np.repeat(cost, len(fdvs)),
+        "user_yt": np.repeat(fill["user_yt"], len(fdvs)),
+        "yt_price_avg": np.repeat(fill["avg_price"], len(fdvs)),
+        "user_share": np.repeat(user_share, len(fdvs)),
+        "user_tokens": np.repeat(user_tokens, len(fdvs)),
+        "airdrop_value": airdrop_value.ravel(),
+        "roi": roi.ravel(),
+    })
+    return df.set_index(["schedule_id", "fdv"])
+
+
+def position_size_sweep(
+    network_model,
+    token_cfg,
+    spend_sizes,
+    airdrop_pct,
+    total_supply,
+    time_weighting,
+    fdv_list,
+    entry_days=None,
+):
+    """ROI of one YT token across position sizes and entry days, with slippage.
+
+    Fills for every (spend size, entry day) pair are solved in one batched
+    AMM call against the token's "liquidity" pool (see _amm_fill); without a
+    pool every size fills at the path price and ROI does not depend on size.
+    Returns one row per (spend_usd, entry_day, fdv); unfillable orders are
+    dropped.
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for position_size_sweep. Install with: pip install pandas")
+
+    days = network_model["days"]
+    network_points = network_model["network_points"]
+    multiplier, held_weight = _token_point_weights(network_model["duration_days"], time_weighting, token_cfg)
+    yt_prices = _build_token_price_path(days, token_cfg)
+    pool = _token_liquidity_pool(days, token_cfg, yt_prices)
+    if entry_days is None:
+        entry_days = days
+    entry_days = np.asarray(entry_days, dtype=int)
+
+    spend = np.asarray(spend_sizes, dtype=float)
+    user_yt = _fill_yt(spend[:, None], yt_prices, pool)[:, entry_days]
+    size_idx, day_idx = np.nonzero(user_yt > 0)
+    user_yt = user_yt[size_idx, day_idx]
+    cost = spend[size_idx]
+    entry_day = entry_days[day_idx]
+
+    fill_price = cost / user_yt
+    mid_price = yt_prices[entry_day]
+    user_points = user_yt * multiplier * held_weight[entry_day]
+    user_share = user_points / network_points if network_points > 0 else np.zeros_like(cost)
+    user_tokens = float(total_supply * airdrop_pct) * user_share
+
+    fdvs = np.asarray(fdv_list, dtype=float)
+    airdrop_value = user_tokens[:, None] * (fdvs / total_supply)[None, :]
+    roi = (airdrop_value - cost[:, None]) / cost[:, None]
+
+    n_rows = len(cost)
+    df = pd.DataFrame({
+        "spend_usd": np.repeat(cost, len(fdvs)),
+        "entry_day": np.repeat(entry_day, len(fdvs)),
+        "fdv": np.tile(fdv_list, n_rows),
+        "user_yt": np.repeat(user_yt, len(fdvs)),
+        "yt_price_mid": np.repeat(mid_price, len(fdvs)),
+        "yt_price_fill": np.repeat(fill_price, len(fdvs)),
+        "price_impact": np.repeat(fill_price / mid_price - 1.0, len(fdvs)),
+        "user_share": np.repeat(user_share, len(fdvs)),
+        "airdrop_value": airdrop_value.ravel(),
+        "roi": roi.ravel(),
+    })
+    return df.set_index(["spend_usd", "entry_day", "fdv"])
+
+
+def fit_lognormal_fdv(comparable_fdvs):
+    """Fit a lognormal FDV distribution to FDVs of comparable launches."""
+    logs = np.log(np.asarray(comparable_fdvs, dtype=float))
+    if len(logs) < 2:
+        raise ValueError("need at least two comparable FDVs to fit a lognormal")
+    return {"kind": "lognormal", "median": float(np.exp(logs.mean())), "sigma": float(logs.std(ddof=1))}
+
+
+def _fdv_distribution(spec):
+    """Mean, CDF and quantile function for an FDV_DISTRIBUTION spec."""
+    kind = spec.get("kind", "lognormal")
+
+    if kind == "lognormal":
+        sigma = float(spec["sigma"])
+        if sigma <= 0:
+            raise ValueError("lognormal FDV distribution needs sigma > 0")
+        if "median" in spec:
+            mu = np.log(float(spec["median"]))
+        elif "mean" in spec:
+            mu = np.log(float(spec["mean"])) - sigma ** 2 / 2.0
+        else:
+            raise ValueError("lognormal FDV distribution needs 'median' or 'mean'")
+        log_fdv = NormalDist(mu, sigma)
+        log_cdf = np.vectorize(log_fdv.cdf, otypes=[float])
+
+        def cdf(x):
+            x = np.asarray(x, dtype=float)
+            with np.errstate(divide="ignore"):
+                return log_cdf(np.log(np.maximum(x, 0.0)))
+
+        def ppf(q):
+            if q <= 0:
+                return 0.0
+            if q >= 1:
+                return float("inf")
+            return float(np.exp(log_fdv.inv_cdf(q)))
+
+        return {"mean": float(np.exp(mu + sigma ** 2 / 2.0)), "cdf": cdf, "ppf": ppf}
+
+    if kind == "loguniform":
+        low, high = float(spec["low"]), float(spec["high"])
+        if not 0 < low < high:
+            raise ValueError("loguniform FDV distribution needs 0 < low < high")
+        span = np.log(high / low)
+
+        def cdf(x):
+            x = np.asarray(x, dtype=float)
+            with np.errstate(divide="ignore"):
+                return np.clip(np.log(np.maximum(x, 0.0) / low) / span, 0.0, 1.0)
+
+        def ppf(q):
+            return float(low * (high / low) ** q)
+
+        return {"mean": float((high - low) / span), "cdf": cdf, "ppf": ppf}
+
+    if kind == "empirical":
+        values = np.asarray(spec["values"], dtype=float)
+        weights = np.asarray(spec.get("weights", np.ones(len(values))), dtype=float)
+        order = np.argsort(values)
+        values = values[order]
+        cum_weights = np.cumsum(weights[order]) / weights.sum()
+
+        def cdf(x):
+            idx = np.searchsorted(values, np.asarray(x, dtype=float), side="right")
+            return np.concatenate([[0.0], cum_weights])[idx]
+
+        def ppf(q):
+            idx = min(int(np.searchsorted(cum_weights, q, side="left")), len(values) - 1)
+            return float(values[idx])
+
+        return {"mean": float(np.average(values, weights=weights[order])), "cdf": cdf, "ppf": ppf}
+
+    raise ValueError(f"Unknown FDV distribution kind '{kind}'")
+
+
+def fdv_distribution_sweep(
+    network_model,
+    user_yt_tokens,
+    airdrop_pct,
+    total_supply,
+    time_weighting,
+    fdv_distribution,
+    entry_days=None,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+):
+    """Expected ROI, ROI quantiles and P(profit) per entry day for an FDV distribution.
+
+    Airdrop value is linear in FDV, so the expectation is E[FDV] scaled by
+    the user's tokens, ROI quantiles are the FDV quantiles mapped through the
+    same line, and P(profit) = P(FDV > breakeven FDV). One row per entry day
+    replaces the (entry_day, fdv) rows of a dense FDV_LIST sweep.
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for fdv_distribution_sweep. Install with: pip install pandas")
+
+    if user_yt_tokens is None or len(user_yt_tokens) == 0:
+        raise ValueError("user_yt_tokens must contain at least one token configuration")
+
+    days = network_model["days"]
+    network_points = network_model["network_points"]
+    positions = _entry_day_positions(days, user_yt_tokens, time_weighting)
+    dist = _fdv_distribution(fdv_distribution)
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("quantiles must be between 0 and 1")
+
+    if entry_days is None:
+        entry_days = days
+    entry_days = np.asarray([ed for ed in entry_days if 0 <= ed < len(days)], dtype=int)
+
+    total_spend = positions["total_spend"]
+    user_share = positions["user_points"][entry_days] / network_points if network_points > 0 else np.zeros(len(entry_days))
+    user_tokens = float(total_supply * airdrop_pct) * user_share
+    tokens_per_fdv = user_tokens / total_supply
+
+    def roi_at(fdv):
+        if total_spend <= 0:
+            return np.full(len(entry_days), np.nan)
+        with np.errstate(invalid="ignore"):
+            # fdv is inf at the 100% quantile of an unbounded distribution
+            return (tokens_per_fdv * fdv - total_spend) / total_spend
+
+    breakeven_fdv = np.divide(
+        total_spend, tokens_per_fdv, out=np.full(len(entry_days), np.inf), where=tokens_per_fdv > 0
+    )
+    columns = {
+        "entry_day": entry_days,
+        "yt_price_avg": positions["yt_price_avg"][entry_days],
+        "user_tokens": user_tokens,
+        "expected_value": tokens_per_fdv * dist["mean"],
+        "expected_roi": roi_at(dist["mean"]),
+        "breakeven_fdv": breakeven_fdv,
+        "p_profit": np.where(np.isfinite(breakeven_fdv), 1.0 - dist["cdf"](breakeven_fdv), 0.0),
+    }
+    for q in quantiles:
+        columns[f"roi_p{int(round(q * 100)):02d}"] = roi_at(dist["ppf"](q))
+
+    return pd.DataFrame(columns).set_index("entry_day")
+
+
+# =========================
+# 📂 PORTFOLIO (many points programs on one calendar)
+# =========================
+
+def _program_scenario(program):
+    """Fill a PORTFOLIO_PROGRAMS entry with defaults from the configuration section.
+
+    Protocol-specific inputs (token_configs, user_yt_tokens, fdv_list,
+    network_points_total) are never inherited from the single-protocol config.
+    Keys that are neither a scenario parameter nor name / start_date /
+    user_yt_tokens / fdv_list are rejected.
+    """
+    scenario = {
+        "airdrop_pct": AIRDROP_PCT,
+        "total_supply": TOTAL_SUPPLY,
+        "duration_days": POINTS_PROGRAM_DURATION_DAYS,
+        "tvl_mode": TVL_MODE,
+        "tvl_initial": TVL_INITIAL,
+        "tvl_final": TVL_FINAL,
+        "tvl_average": TVL_AVERAGE,
+        "pendle_mode": PENDLE_MODE,
+        "pendle_share_initial": PENDLE_SHARE_INITIAL,
+        "pendle_share_final": PENDLE_SHARE_FINAL,
+        "pendle_share_mode": PENDLE_SHARE_MODE,
+        "pendle_share_average": None,
+        "base_multiplier_pendle": BASE_MULTIPLIER_PENDLE,
+        "base_multiplier_direct": BASE_MULTIPLIER_DIRECT,
+        "time_weighting": TIME_WEIGHTING,
+        "pendle_start_day": PENDLE_MARKETS_START_DAY,
+        "component_tvl_scaling": COMPONENT_TVL_SCALING,
+        "token_configs": None,
+        "network_points_total": None,
+    }
+    unknown = sorted(set(program) - set(scenario) - {"name", "start_date", "user_yt_tokens", "fdv_list"})
+    if unknown:
+        raise ValueError(f"Unknown key '{unknown[0]}' in program '{program.get('name')}'")
+    scenario.update(program)
+    if not scenario.get("user_yt_tokens"):
+        raise ValueError(f"program '{scenario.get('name')}' has no user_yt_tokens")
+    return scenario
+
+
+def build_portfolio_model(programs, scenario_names=None):
+    """Align many points programs on one calendar and precompute their economics.
+
+    Each program's network model and time-weight table is built exactly once.
+    Positions are linear in the USD allocated to a program (spend is split
+    across its user_yt_tokens in proportion to their spend_usd), so each
+    program reduces to a value-per-USD vector over FDV scenarios, and any
+    budget allocation is then evaluated with a single array product. Tokens
+    with a liquidity model are linearised at their configured spend_usd.
+    Positions are valued like simulate_airdrop_unified, including any
+    entry_schedule, whose tranches are spread over spend_calendar.
+    """
+    if not programs:
+        raise ValueError("programs must contain at least one points program")
+
+    scenarios = [_program_scenario(p) for p in programs]
+    names = [sc.get("name", f"program_{i}") for i, sc in enumerate(scenarios)]
+    n_fdv = len(scenarios[0]["fdv_list"])
+    if scenario_names is None:
+        scenario_names = [f"fdv_{i}" for i in range(n_fdv)]
+    if any(len(sc["fdv_list"]) != len(scenario_names) for sc in scenarios):
+        raise ValueError("every program needs one fdv_list entry per FDV scenario")
+
+    starts = [np.datetime64(sc["start_date"], "D") if sc.get("start_date") else None for sc in scenarios]
+    known = [s for s in starts if s is not None]
+    origin = min(known) if known else np.datetime64("today", "D")
+    offsets = np.array([int((s - origin).astype(int)) if s is not None else 0 for s in starts])
+    durations = np.array([int(sc["duration_days"]) for sc in scenarios])
+    calendar = origin + np.arange(int((offsets + durations).max()))
+
+    networks = []
+    allocation_usd = np.zeros(len(scenarios))
+    value_per_usd = np.zeros((len(scenarios), len(scenario_names)))
+    network_points_calendar = np.zeros((len(scenarios), len(calendar)))
+    spend_calendar = np.zeros((len(scenarios), len(calendar)))
+
+    for p, (sc, offset) in enumerate(zip(scenarios, offsets)):
+        network = build_network_model(
+            sc["duration_days"], sc["tvl_mode"], sc["tvl_initial"], sc["tvl_final"],
+            sc["tvl_average"], sc["pendle_mode"], sc["pendle_share_initial"],
+            sc["pendle_share_final"], sc["pendle_share_mode"], sc["pendle_share_average"],
+            sc["base_multiplier_pendle"], sc["base_multiplier_direct"],
+            sc["token_configs"], sc["network_points_total"],
+            pendle_start_day=sc["pendle_start_day"],
+            component_tvl_scaling=sc["component_tvl_scaling"],
+        )
+        networks.append(network)
+        days = network["days"]
+
+        user_points = 0.0
+        for token_cfg in sc["user_yt_tokens"]:
+            entry_day = token_cfg.get("entry_day", 0)
+            if token_cfg.get("entry_date"):
+                entry_day = int((np.datetime64(token_cfg["entry_date"], "D") - calendar[offset]).astype(int))
+            if not 0 <= entry_day < len(days):
+                raise ValueError(f"entry day {entry_day} is outside program '{names[p]}'")
+            token_cfg = dict(token_cfg, entry_day=entry_day)
+            result = _simulate_user_token(days, sc["duration_days"], token_cfg, sc["time_weighting"])
+            user_points += result["user_points"]
+            allocation_usd[p] += result["spend_usd"]
+            spend_calendar[p, offset:offset + len(days)] += _token_spend_daily(days, token_cfg)
+
+        if network["network_points_daily"] is not None:
+            network_points_calendar[p, offset:offset + len(days)] = network["network_points_daily"]
+        else:
+            network_points_calendar[p, offset:offset + len(days)] = network["network_points"] / len(days)
+
+        if allocation_usd[p] > 0 and network["network_points"] > 0:
+            tokens_per_usd = sc["airdrop_pct"] * (user_points / network["network_points"]) / allocation_usd[p]
+            # airdrop_pct × total_supply tokens, each worth fdv / total_supply
+            value_per_usd[p] = tokens_per_usd * np.asarray(sc["fdv_list"], dtype=float)
+
+    return {
+        "programs": names,
+        "scenarios": list(scenario_names),
+        "calendar": calendar,
+        "offsets": offsets,
+        "networks": networks,
+        "allocation_usd": allocation_usd,
+        "value_per_usd": value_per_usd,
+        "network_points_calendar": network_points_calendar,
+        "spend_calendar": spend_calendar,
+    }
+
+
+def _portfolio_allocations(model, allocations):
+    """Allocation array (programs,) or (n, programs) from None, a dict or an array."""
+    if allocations is None:
+        return model["allocation_usd"]
+    if isinstance(allocations, dict):
+        unknown = set(allocations) - set(model["programs"])
+        if unknown:
+            raise ValueError(f"Unknown programs in allocations: {sorted(unknown)}")
+        return np.array([float(allocations.get(name, 0.0)) for name in model["programs"]])
+    allocations = np.asarray(allocations, dtype=float)
+    if allocations.shape[-1] != len(model["programs"]):
+        raise ValueError("allocations must have one column per program")
+    return allocations
+
+
+def rebalance_portfolio(model, allocations):
+    """Aggregate ROI for a batch of allocations, shape (n_allocations, n_scenarios)."""
+    alloc = np.atleast_2d(_portfolio_allocations(model, allocations))
+    total = alloc.sum(axis=1, keepdims=True)
+    value = alloc @ model["value_per_usd"]
+    return np.divide(value - total, total, out=np.full(value.shape, np.nan), where=total > 0)
+
+
+def evaluate_portfolio(model, allocations=None):
+    """Per-protocol and aggregate results for one budget allocation.
+
+    allocations: None (each program's configured spend_usd), a dict of
+    program name -> USD, or an array with one USD amount per program.
+    """
+    if not PANDAS_AVAILABLE:
+        raise ImportError("pandas is required for evaluate_portfolio. Install with: pip install pandas")
+
+    alloc = _portfolio_allocations(model, allocations)
+    if alloc.ndim != 1:
+        raise ValueError("evaluate_portfolio takes a single allocation; use rebalance_portfolio for batches")
+    value = alloc[:, None] * model["value_per_usd"]
+
+    columns = {"allocation_usd": alloc}
+    for s, scenario in enumerate(model["scenarios"]):
+        columns[f"value_{scenario}"] = value[:, s]
+        columns[f"roi_{scenario}"] = np.where(alloc > 0, model["value_per_usd"][:, s] - 1.0, np.nan)
+    per_protocol = pd.DataFrame(columns, index=pd.Index(model["programs"], name="program"))
+
+    aggregate_roi = rebalance_portfolio(model, alloc)[0]
+    return {
+        "per_protocol": per_protocol,
+        "aggregate_roi": {s: float(v) for s, v in zip(model["scenarios"], aggregate_roi)},
+        "total_allocated_usd": float(alloc.sum()),
+        "aggregate_value": {s: float(v) for s, v in zip(model["scenarios"], value.sum(axis=0))},
+    }
+
+
+# =========================
+# 🎯 CALIBRATION (fit TVL path and multipliers to observed points)
+# =========================
+
+TVL_MODES = (
+    "average", "linear", "exp", "logistic",
+    "up_then_down", "down_then_up", "front_loaded", "back_loaded",
+)
+
+
+def _points_observations(observed, duration_days):
+    """(days, cumulative points) arrays from {day: points} or [(day, points), ...]."""
+    if not observed:
+        return np.array([], dtype=int), np.array([], dtype=float)
+    pairs = sorted(observed.items() if isinstance(observed, dict) else observed)
+    obs_days = np.array([int(day) for day, _ in pairs], dtype=int)
+    obs_points = np.array([float(points) for _, points in pairs], dtype=float)
+    if np.any((obs_days < 0) | (obs_days >= duration_days)):
+        raise ValueError(f"observed points must be on days 0..{duration_days - 1}")
+    if np.any(obs_points <= 0):
+        raise ValueError("observed points must be > 0")
+    return obs_days, obs_points
+
+
+def _tvl_candidates(days, tvl_modes, tvl_initial, tvl_final, tvl_average, grid_size, tvl_span, fit_level=True):
+    """Candidate TVL parameter sets (geometric grids around the configured values) and their paths.
+
+    With fit_level False only the shape varies: tvl_initial and tvl_average
+    stay at their configured values and tvl_final sweeps the grid.
+    """
+    fallback = next(v for v in (tvl_average, tvl_initial, tvl_final) if v is not None)
+    def grid(center, vary=True):
+        center = float(center if center is not None else fallback)
+        if not vary:
+            return np.array([center])
+        return np.geomspace(center / tvl_span, center * tvl_span, grid_size)
+
+    candidates = []
+    for mode in tvl_modes:
+        if mode == "average":
+            candidates += [
+                {"tvl_mode": mode, "tvl_initial": tvl_initial, "tvl_final": tvl_final, "tvl_average": float(avg)}
+                for avg in grid(tvl_average, fit_level)
+            ]
+        else:
+            candidates += [
+                {"tvl_mode": mode, "tvl_initial": float(ini), "tvl_final": float(fin), "tvl_average": tvl_average}
+                for ini in grid(tvl_initial, fit_level) for fin in grid(tvl_final)
+            ]
+    paths = np.array([
+        _build_tvl_path(days, c["tvl_mode"], c["tvl_initial"], c["tvl_final"], c["tvl_average"])
+        for c in candidates
+    ])
+    return candidates, paths
+
+
+def _determined_columns(design, tol=1e-8):
+    """Which columns of a (batch, rows, columns) design every batch entry pins down on its own.
+
+    A column is determined when no combination of the other columns can
+    stand in for it, i.e. its unit vector has no component in the null space.
+    """
+    n_cols = design.shape[2]
+    if n_cols == 0:
+        return np.zeros(0, dtype=bool)
+    norm = np.linalg.norm(design, axis=1, keepdims=True)
+    unit = np.divide(design, norm, out=np.zeros_like(design), where=norm > 0)
+    _, sing, vh = np.linalg.svd(unit, full_matrices=True)
+    rank = (sing > tol).sum(axis=1)
+    null = np.arange(n_cols)[None, :] >= rank[:, None]
+    leak = np.einsum("bk,bkj->bj", null, vh ** 2)
+    return np.all(leak < tol, axis=0)
+
+
+def _scale_multiplier_spec(spec, factor):
+    """Multiplier spec (see _build_multiplier_path) scaled by factor, keeping its shape."""
+    if isinstance(spec, dict):
+        scaled = dict(spec)
+        scaled["base"] = float(spec.get("base", 1.0)) * factor
+        if "steps" in spec:
+            scaled["steps"] = [[day, float(value) * factor] for day, value in spec["steps"]]
+        return scaled
+    values = np.asarray(spec, dtype=float)
+    if values.ndim == 0:
+        return float(values) * factor
+    return values * factor
+
+
+def calibrate_network_model(
+    observed_points,
+    duration_days,
+    pendle_mode,
+    pendle_share_initial,
+    pendle_share_final,
+    pendle_share_mode,
+    pendle_share_average,
+    base_multiplier_pendle,
+    base_multiplier_direct,
+    token_configs,
+    tvl_initial,
+    tvl_final,
+    tvl_average,
+    wallet_points=None,
+    tvl_modes=None,
+    grid_size=25,
+    tvl_span=10.0,
+    refine_rounds=2,
+    fit_multipliers=True,
+    pendle_start_day=None,
+    component_tvl_scaling=None,
+    tvl_mode=None,
+):
+    """Fit the TVL path and points multipliers to observed cumulative points.
+
+    observed_points maps program day -> cumulative network points up to and
+    including that day. wallet_points lists leaderboard wallets with known
+    holdings: {"token": name or index (by_tokens only), "venue": "yt_pendle"
+    or "direct", "balance_usd", "entry_day", "points": {day: cumulative}}.
+
+    Points are linear in the multipliers (mult_yt_pendle / mult_direct per
+    TOKEN_CONFIGS entry, or BASE_MULTIPLIER_* in "simple" mode), so every
+    candidate TVL path (all tvl_modes over a grid_size² geometric grid
+    spanning tvl_span× around the configured TVL values, then refine_rounds
+    finer grids around the best one) gets its multipliers by one batched
+    weighted least-squares solve, minimising relative error. Each multiplier
+    is fitted as a scale factor on its configured daily path, so schedules
+    keep their steps and boosts. Multipliers no observation depends on, or
+    all of them if fit_multipliers is False, keep their configured values.
+    Multipliers the data cannot pin down one by one (points accruing with
+    the same daily profile, e.g. every token when only network totals are
+    observed) share one common scale, listed in fit["scaled"] with
+    fit["common_scale"]; if even that is undetermined they stay as
+    configured. Add wallet observations to pin them individually.
+    Candidates needing a negative multiplier are rejected; if every
+    candidate needs one, ValueError is raised.
+
+    Parameters the points cannot determine are kept as configured and
+    listed in fit["fixed"]. In "by_tokens" mode with "proportional"
+    COMPONENT_TVL_SCALING only the TVL shape matters, so tvl_initial and
+    tvl_average keep their configured level; with "constant" scaling the TVL
+    path does not affect points at all and tvl_mode (default "average" if
+    tvl_average is set, else "linear") and all TVL values are kept. In
+    "simple" mode TVL level and multipliers are confounded, so multipliers
+    are only fitted where wallet observations pin them.
+
+    Returns {"network_model": build_network_model result for the best fit,
+    "params": fitted build_network_model arguments, "fit": goodness-of-fit,
+    "ranking": best candidates}.
+    """
+    days = np.arange(duration_days)
+    if pendle_start_day is None:
+        pendle_start_day = _resolve_pendle_start_day()
+    pendle_start_day = max(0, int(pendle_start_day))
+    if component_tvl_scaling is None:
+        component_tvl_scaling = globals().get("COMPONENT_TVL_SCALING", "proportional")
+    obs_days, obs_points = _points_observations(observed_points, duration_days)
+    wallets = list(wallet_points or [])
+    if len(obs_days) == 0 and not wallets:
+        raise ValueError("calibration needs observed_points or wallet_points")
+
+    # Linear parameters: one multiplier per (token, venue), or per venue in simple mode
+    pendle_live = days >= pendle_start_day
+    if pendle_mode == "by_tokens":
+        if not token_configs:
+            raise ValueError("token_configs must be provided when pendle_mode='by_tokens'")
+        keys = [(k, "mult_yt_pendle") for k in range(len(token_configs))]
+        keys += [(k, "mult_direct") for k in range(len(token_configs))]
+        defaults = {"mult_yt_pendle": base_multiplier_pendle, "mult_direct": base_multiplier_direct}
+        current = [
+            _build_multiplier_path(
+                days, token_configs[k].get(name, defaults[name]), token_configs[k].get("campaign_end_day")
+            )
+            for k, name in keys
+        ]
+        names = [f"{token_configs[k].get('name', k)}.{name}" for k, name in keys]
+        tvl_yt = np.array([float(t.get("tvl_yt_pendle", 0)) for t in token_configs])
+        tvl_direct = np.array([float(t.get("tvl_direct", 0)) for t in token_configs])
+    elif pendle_mode == "simple":
+        keys = [(None, "base_multiplier_pendle"), (None, "base_multiplier_direct")]
+        current = [
+            _build_multiplier_path(days, base_multiplier_pendle),
+            _build_multiplier_path(days, base_multiplier_direct),
+        ]
+        names = [name for _, name in keys]
+        share = _pendle_share_daily(
+            days, pendle_start_day, pendle_share_mode,
+            pendle_share_initial, pendle_share_final, pendle_share_average,
+        )
+    else:
+        raise ValueError(f"Unknown pendle_mode '{pendle_mode}'")
+    current = np.array([np.broadcast_to(c, len(days)) for c in current], dtype=float)
+    n_params = len(keys)
+
+    # Wallet points at the configured multipliers do not depend on the TVL path
+    if pendle_mode == "by_tokens":
+        venue_keys = {"yt_pendle": "mult_yt_pendle", "direct": "mult_direct"}
+        token_names = [t.get("name") for t in token_configs]
+    else:
+        venue_keys = {"yt_pendle": "base_multiplier_pendle", "direct": "base_multiplier_direct"}
+    design_wallet, wallet_obs = [], []
+    for wallet in wallets:
+        if wallet["venue"] not in venue_keys:
+            raise ValueError(f"Unknown wallet venue '{wallet['venue']}'")
+        token = None
+        if pendle_mode == "by_tokens":
+            token = wallet["token"]
+            if not isinstance(token, (int, np.integer)):
+                if token not in token_names:
+                    raise ValueError(f"Unknown wallet token '{token}'")
+                token = token_names.index(token)
+        j = keys.index((token, venue_keys[wallet["venue"]]))
+        held = (days >= int(wallet.get("entry_day", 0))) * float(wallet["balance_usd"])
+        held_points = np.cumsum(held * current[j])
+        w_days, w_points = _points_observations(wallet["points"], duration_days)
+        for day, points in zip(w_days, w_points):
+            row = np.zeros(n_params)
+            row[j] = held_points[day]
+            design_wallet.append(row)
+            wallet_obs.append(points)
+    design_wallet = np.array(design_wallet).reshape(-1, n_params)
+    observed = np.concatenate([obs_points, np.array(wallet_obs, dtype=float)])
+    weight = 1.0 / observed
+
+    def solve(tvl_paths, fit, common):
+        """Batched weighted least squares (relative error) for a stack of TVL paths.
+
+        Solves for each multiplier's scale on its configured path, as a
+        deviation from 1: individually for fit & ~common, one shared scale
+        for common, none elsewhere.
+        """
+        n = len(tvl_paths)
+        # Daily network points at the configured multipliers: (candidate, param, day)
+        if pendle_mode == "by_tokens":
+            avg_tvl = tvl_paths.mean(axis=1, keepdims=True)
+            scale = np.ones_like(tvl_paths)
+            if tvl_yt.sum() + tvl_direct.sum() > 0 and component_tvl_scaling != "constant":
+                np.divide(tvl_paths, avg_tvl, out=scale, where=avg_tvl > 0)
+            unit_daily = np.concatenate([
+                tvl_yt[None, :, None] * (scale * pendle_live)[:, None, :],
+                tvl_direct[None, :, None] * scale[:, None, :],
+            ], axis=1)
+        else:
+            unit_daily = np.stack([tvl_paths * share, tvl_paths * (1.0 - share)], axis=1)
+        design = np.concatenate([
+            np.cumsum(unit_daily * current[None], axis=2)[:, :, obs_days].transpose(0, 2, 1),
+            np.broadcast_to(design_wallet, (n,) + design_wallet.shape),
+        ], axis=1)
+
+        def basis(fit, common):
+            columns = [np.eye(n_params)[:, j] for j in np.nonzero(fit & ~common)[0]]
+            if common.any():
+                columns.append(common.astype(float))
+            return np.array(columns).reshape(-1, n_params).T
+
+        if fit is None:
+            if not fit_multipliers:
+                fit = np.zeros(n_params, dtype=bool)
+            elif pendle_mode == "simple":
+                # Network points only pin TVL level × multiplier; wallets pin multipliers
+                fit = design_wallet.any(axis=0)
             else:
-                breakeven_price = np.inf
-            
-            is_profitable = roi is not None and roi > 0
-            
-            future_days = days[ed:]
-            future_profitable_count = 0
-            for fd in future_days:
-                avg_future_price = sum(
-                    token_price_paths[i][fd] * token_spend[i] / total_spend
-                    for i in range(len(token_price_paths))
-                    if token_price_paths[i][fd] > 0
-                )
-                if avg_future_price < breakeven_price and avg_future_price > 0:
-                    future_profitable_count += 1
-            
-            results.append({
-                "entry_day": ed,
-                "fdv": fdv,
-                "yt_price_avg": avg_price,
-                "user_yt_total": total_yt_amount,
-                "user_share": user_share,
-                "user_tokens": user_tokens,
-                "airdrop_value": airdrop_value,
-                "roi": roi,
-                "breakeven_price": breakeven_price,
-                "is_profitable": is_profitable,
-                "future_profitable_days": future_profitable_count,
-            })
-    
-    df = pd.DataFrame(results)
-    df = df.set_index(["entry_day", "fdv"])
-    
-    return df
+                fit = design.any(axis=(0, 1))
+            # Columns the observations cannot separate share one scale, if that is determined
+            common = fit.copy()
+            common[fit] = ~_determined_columns(design[:, :, fit] * weight[None, :, None])
+            if common.any() and not _determined_columns((design @ basis(fit, common)) * weight[None, :, None]).all():
+                fit = fit & ~common
+                common = np.zeros(n_params, dtype=bool)
+
+        reduced = design @ basis(fit, common)
+        residual = observed - design.sum(axis=2)
+        delta = np.linalg.pinv(reduced * weight[None, :, None]) @ (residual * weight)[:, :, None]
+        coef = 1.0 + (basis(fit, common) @ delta)[:, :, 0]
+        predicted = (design @ coef[:, :, None])[:, :, 0]
+        rel_error = (predicted - observed) * weight
+        return fit, common, coef, predicted, rel_error
+
+    # What the observed points can tell about the TVL path
+    fixed_tvl = []
+    fit_level = True
+    if pendle_mode == "by_tokens":
+        if component_tvl_scaling == "constant" or tvl_yt.sum() + tvl_direct.sum() <= 0:
+            fixed_tvl = ["tvl_mode", "tvl_initial", "tvl_final", "tvl_average"]
+        else:
+            fixed_tvl = ["tvl_initial", "tvl_average"]
+            fit_level = False
+
+    if len(fixed_tvl) == 4:
+        if tvl_mode is None:
+            tvl_mode = "average" if tvl_average is not None else "linear"
+        candidates = [{"tvl_mode": tvl_mode, "tvl_initial": tvl_initial,
+                       "tvl_final": tvl_final, "tvl_average": tvl_average}]
+        tvl_paths = _build_tvl_path(days, tvl_mode, tvl_initial, tvl_final, tvl_average)[None, :]
+        refine_rounds = 0
+    else:
+        candidates, tvl_paths = _tvl_candidates(
+            days, tvl_modes or TVL_MODES, tvl_initial, tvl_final, tvl_average,
+            grid_size, tvl_span, fit_level,
+        )
+    fit, common, coef, predicted, rel_error = solve(tvl_paths, None, None)
+
+    # Zoom the grid around the best candidate: each round spans one step of the previous grid
+    span = tvl_span
+    for _ in range(refine_rounds):
+        loss = np.sqrt(np.mean(rel_error ** 2, axis=1))
+        loss = np.where(np.all(coef >= 0, axis=1), loss, np.inf)
+        top = candidates[int(np.argmin(loss))]
+        span = span ** (2.0 / (grid_size - 1)) if grid_size > 1 else span
+        new_candidates, new_paths = _tvl_candidates(
+            days, [top["tvl_mode"]], top["tvl_initial"], top["tvl_final"], top["tvl_average"],
+            grid_size, span, fit_level,
+        )
+        _, _, new_coef, new_predicted, new_rel_error = solve(new_paths, fit, common)
+        candidates += new_candidates
+        coef = np.concatenate([coef, new_coef])
+        predicted = np.concatenate([predicted, new_predicted])
+        rel_error = np.concatenate([rel_error, new_rel_error])
+
+    # Candidates needing a negative multiplier are rejected
+    loss = np.sqrt(np.mean(rel_error ** 2, axis=1))
+    valid = np.all(coef >= 0, axis=1)
+    if not valid.any():
+        raise ValueError(
+            "no TVL candidate fits the observations with non-negative multipliers; "
+            "check the observed points or set fit_multipliers=False"
+        )
+    loss = np.where(valid, loss, np.inf)
+    best = int(np.argmin(loss))
+    n_candidates = len(candidates)
+
+    # Fitted multipliers: configured specs scaled where fitted, unchanged elsewhere
+    params = dict(candidates[best])
+    params["base_multiplier_pendle"] = base_multiplier_pendle
+    params["base_multiplier_direct"] = base_multiplier_direct
+    params["token_configs"] = token_configs
+    if pendle_mode == "by_tokens":
+        params["token_configs"] = [dict(cfg) for cfg in token_configs]
+    for j in np.nonzero(fit)[0]:
+        k, name = keys[j]
+        if k is None:
+            params[name] = _scale_multiplier_spec(params[name], float(coef[best, j]))
+        else:
+            cfg = params["token_configs"][k]
+            cfg[name] = _scale_multiplier_spec(cfg.get(name, defaults[name]), float(coef[best, j]))
+
+    network_model = build_network_model(
+        duration_days, params["tvl_mode"], params["tvl_initial"], params["tvl_final"],
+        params["tvl_average"], pendle_mode, pendle_share_initial, pendle_share_final,
+        pendle_share_mode, pendle_share_average,
+        params["base_multiplier_pendle"], params["base_multiplier_direct"],
+        params["token_configs"], None, pendle_start_day, component_tvl_scaling,
+    )
+
+    n_net = len(obs_points)
+    r2 = None
+    if n_net > 1:
+        ss_res = float(np.sum((predicted[best, :n_net] - obs_points) ** 2))
+        ss_tot = float(np.sum((obs_points - obs_points.mean()) ** 2))
+        r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else None
+    order = np.argsort(loss)[:5]
+
+    return {
+        "network_model": network_model,
+        "params": params,
+        "fit": {
+            "rmse_rel": float(loss[best]),
+            "max_rel_error": float(np.abs(rel_error[best]).max()),
+            "r2": r2,
+            "predicted": predicted[best],
+            "observed": observed,
+            "n_observations": len(observed),
+            "n_candidates": n_candidates,
+            "fitted": [names[j] for j in np.nonzero(fit & ~common)[0]],
+            "scaled": [names[j] for j in np.nonzero(common)[0]],
+            "common_scale": float(coef[best, common][0]) if common.any() else None,
+            "fixed": [names[j] for j in np.nonzero(~fit)[0]] + fixed_tvl,
+        },
+        "ranking": [
+            dict(candidates[i], rmse_rel=float(loss[i])) for i in order if np.isfinite(loss[i])
+        ],
+    }
+
+
+# =========================
+# 🌐 WEB EXPORT (lookup tables + parity corpus for website/)
+# =========================
+
+LOOKUP_TABLE_MAGIC = b"PTLT"
+LOOKUP_TABLE_VERSION = 1
+_LOOKUP_MISSING = 65535
+
+
+def build_lookup_grid(
+    network_model,
+    user_yt_tokens,
+    airdrop_pct,
+    total_supply,
+    time_weighting,
+    fdv_grid,
+    tvl_levels,
+    multiplier_grid,
+):
+    """Airdrop value per USD spent over token × entry day × FDV × TVL level × multiplier.
+
+    Spend cancels out of a single position's ROI, so one grid per YT token
+    covers every position size: ROI = value_multiple - 1 (liquidity models are
+    ignored here, since slippage breaks that). tvl_level scales all
+    points-earning TVL (and therefore network points) of network_model.
+    The multiplier axis is a constant user multiplier; token multiplier
+    schedules are not tabulated. Days where the YT cannot be bought are NaN.
+    """
+    days = network_model["days"]
+    network_points = network_model["network_points"]
+    airdrop_tokens = float(total_supply * airdrop_pct)
+
+    fdvs = np.asarray(fdv_grid, dtype=float)
+    levels = np.asarray(tvl_levels, dtype=float)
+    mults = np.asarray(multiplier_grid, dtype=float)
+
+    grid = np.full((len(user_yt_tokens), len(days), len(fdvs), len(levels), len(mults)), np.nan)
+    for i, token_cfg in enumerate(user_yt_tokens):
+        prices = _build_token_price_path(days, token_cfg)
+        held_weight = _token_held_weight(network_model["duration_days"], time_weighting, token_cfg)
+        tradable = prices > 0
+        # Points per USD spent on each entry day, before the user multiplier
+        points_per_usd = np.divide(held_weight, prices, out=np.zeros_like(prices), where=tradable)
+        share_per_usd = points_per_usd / network_points if network_points > 0 else points_per_usd * 0.0
+        value = (
+            airdrop_tokens
+            * share_per_usd[:, None, None, None]
+            * (fdvs / total_supply)[None, :, None, None]
+            / levels[None, None, :, None]
+            * mults[None, None, None, :]
+        )
+        grid[i][tradable] = value[tradable]
+    return grid
+
+
+def export_lookup_table(
+    path,
+    network_model,
+    user_yt_tokens,
+    airdrop_pct,
+    total_supply,
+    time_weighting,
+    fdv_grid,
+    tvl_levels,
+    multiplier_grid,
+):
+    """Write a quantized lookup table for website/calculator.js.
+
+    Layout: 4-byte magic, uint16 version, uint32 header length, UTF-8 JSON
+    header, zero padding to an even offset, then little-endian uint16 data
+    in C order. Values are log(value_multiple) quantized linearly between
+    the header's "min" and "max"; 65535 marks days where the YT cannot be
+    bought. The log is exactly linear in log(FDV), log(multiplier) and
+    log(TVL level), so the front end interpolates those axes in log space.
+    """
+    grid = build_lookup_grid(
+        network_model, user_yt_tokens, airdrop_pct, total_supply,
+        time_weighting, fdv_grid, tvl_levels, multiplier_grid,
+    )
+    with np.errstate(divide="ignore"):
+        log_grid = np.log(grid)
+    finite = np.isfinite(log_grid)
+    lo = float(log_grid[finite].min()) if finite.any() else 0.0
+    hi = float(log_grid[finite].max()) if finite.any() else 0.0
+    step = (hi - lo) / (_LOOKUP_MISSING - 1) if hi > lo else 1.0
+
+    quantized = np.full(grid.shape, _LOOKUP_MISSING, dtype="<u2")
+    quantized[finite] = np.round((log_grid[finite] - lo) / step).astype("<u2")
+
+    header = {
+        "field": "log_value_multiple",
+        "shape": list(grid.shape),
+        "tokens": [t.get("name", "YT") for t in user_yt_tokens],
+        "axes": [
+            {"name": "entry_day", "scale": "linear", "values": [int(d) for d in network_model["days"]]},
+            {"name": "fdv", "scale": "log", "values": [float(v) for v in fdv_grid]},
+            {"name": "tvl_level", "scale": "log", "values": [float(v) for v in tvl_levels]},
+            {"name": "multiplier", "scale": "log", "values": [float(v) for v in multiplier_grid]},
+        ],
+        "quantization": {"dtype": "uint16", "min": lo, "step": step, "missing": _LOOKUP_MISSING},
+        "scenario": {
+            "airdrop_pct": airdrop_pct,
+            "total_supply": total_supply,
+            "duration_days": network_model["duration_days"],
+            "network_points": network_model["network_points"],
+            "avg_tvl": network_model["avg_tvl"],
+        },
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    prefix = LOOKUP_TABLE_MAGIC + struct.pack("<HI", LOOKUP_TABLE_VERSION, len(header_bytes))
+    padding = b"\0" * ((len(prefix) + len(header_bytes)) % 2)
+
+    with open(path, "wb") as f:
+        f.write(prefix + header_bytes + padding)
+        f.write(quantized.tobytes(order="C"))
+    return header
+
+
+def _to_js_config(sim_kwargs):
+    """Translate simulate_airdrop_staged params into calculator.js config keys."""
+    return {
+        "airdropPct": sim_kwargs["airdrop_pct"],
+        "totalSupply": sim_kwargs["total_supply"],
+        "durationDays": sim_kwargs["duration_days"],
+        "tvlMode": sim_kwargs["tvl_mode"],
+        "tvlInitial": sim_kwargs["tvl_initial"],
+        "tvlFinal": sim_kwargs["tvl_final"],
+        "tvlAverage": sim_kwargs["tvl_average"],
+        "pendleMode": sim_kwargs["pendle_mode"],
+        "pendleShareInitial": sim_kwargs["pendle_share_initial"],
+        "pendleShareFinal": sim_kwargs["pendle_share_final"],
+        "pendleShareMode": sim_kwargs["pendle_share_mode"],
+        "pendleShareAverage": sim_kwargs["pendle_share_average"],
+        "baseMultiplierPendle": sim_kwargs["base_multiplier_pendle"],
+        "baseMultiplierDirect": sim_kwargs["base_multiplier_direct"],
+        "tokenConfigs": sim_kwargs["token_configs"],
+        "userYtTokens": sim_kwargs["user_yt_tokens"],
+        "timeWeighting": sim_kwargs["time_weighting"],
+        "fdvList": sim_kwargs["fdv_list"],
+        "networkPointsTotal": sim_kwargs["network_points_total"],
+        "componentTvlScaling": sim_kwargs["component_tvl_scaling"],
+        "pendleMarketsStartDay": sim_kwargs["pendle_start_day"],
+    }
+
+
+# calculator.js allocates a fixed network_points_total by days-remaining
+# weighted contribution, while the Python engine keeps time-weighted user
+# points against the fixed total. Corpus cases using it are expected to differ.
+_KNOWN_JS_DRIFT = {
+    "network_points_total": "calculator.js splits a fixed networkPointsTotal by days-remaining weighted contribution",
+}
+
+
+def _default_golden_cases():
+    """Scenario mix covering every TVL mode, Pendle mode, YT price mode and Pendle start day."""
+    price_setups = [
+        {"yt_price_mode": "linear_to_zero"},
+        {"yt_price_mode": "exp_to_zero"},
+        {"yt_price_mode": "stepwise_linear", "step_days": 7},
+        {"yt_price_mode": "two_phase", "campaign_enabled": True, "campaign_end_day": 20,
+         "pre_mode": "slow_linear", "post_mode": "exp_to_zero", "post_discount": 0.3},
+    ]
+    tvl_modes = ["linear", "exp", "logistic", "average", "up_then_down",
+                 "down_then_up", "front_loaded", "back_loaded"]
+    token_configs = [
+        {"name": "A", "tvl_yt_pendle": 400_000, "tvl_direct": 900_000,
+         "mult_yt_pendle": 5.0, "mult_direct": 1.0},
+        {"name": "B", "tvl_yt_pendle": 200_000, "tvl_direct": 15_000_000,
+         "mult_yt_pendle": 2.0, "mult_direct": 1.0},
+    ]
+    cases = []
+    for i, tvl_mode in enumerate(tvl_modes):
+        for pendle_mode in ["simple", "by_tokens"]:
+            for time_weighting in [True, False]:
+                setup = price_setups[len(cases) % len(price_setups)]
+                user_token = {
+                    "name": "YT", "initial_price": 0.04, "spend_usd": 1000 + 250 * i,
+                    "multiplier": 5.0, "entry_day": (7 * len(cases)) % 60,
+                    "campaign_enabled": False, "step_days": 7,
+                }
+                user_token.update(setup)
+                sim_kwargs = {
+                    "airdrop_pct": 0.10, "total_supply": 1_000_000_000, "duration_days": 80,
+                    "tvl_mode": tvl_mode, "tvl_initial": 20_000_000, "tvl_final": 45_000_000,
+                    "tvl_average": 30_000_000, "pendle_mode": pendle_mode,
+                    "pendle_share_initial": 0.2, "pendle_share_final": 0.4,
+                    "pendle_share_mode": "linear", "pendle_share_average": None,
+                    "base_multiplier_pendle": 5.0, "base_multiplier_direct": 1.0,
+                    "token_configs": token_configs, "user_yt_tokens": [user_token],
+                    "time_weighting": time_weighting,
+                    "fdv_list": [20_000_000, 100_000_000, 500_000_000],
+                    "network_points_total": None,
+                    "pendle_start_day": 0,
+                    "component_tvl_scaling": "constant" if len(cases) % 3 == 2 else "proportional",
+                }
+                cases.append(sim_kwargs)
+
+    # Pendle markets launching mid-program, and a fixed network points total
+    base = cases[0]
+    for pendle_mode in ["simple", "by_tokens"]:
+        for pendle_start_day in [20, 79]:
+            cases.append(dict(base, pendle_mode=pendle_mode, pendle_start_day=pendle_start_day,
+                              tvl_mode="linear"))
+        cases.append(dict(base, pendle_mode=pendle_mode, network_points_total=2_500_000_000))
+    return cases
+
+
+def export_golden_corpus(path, cases=None):
+    """Write Python engine results for website/parity_check.js to compare against.
+
+    cases is a list of simulate_airdrop_staged params (including
+    pendle_start_day and component_tvl_scaling). Cases that use a feature in
+    _KNOWN_JS_DRIFT carry a "known_drift" reason; parity_check.js expects
+    those to differ and reports them separately.
+    """
+    if cases is None:
+        cases = _default_golden_cases()
+
+    corpus = []
+    for sim_kwargs in cases:
+        result = simulate_airdrop_staged(sim_kwargs, {})
+        entry = {
+            "config": _to_js_config(sim_kwargs),
+            "expected": {
+                "network_points": result["network_points"],
+                "user_points": result["user_points"],
+                "user_share": result["user_share"],
+                "user_tokens": result["user_tokens"],
+                "roi_per_fdv": {str(k): v for k, v in result["roi_per_fdv"].items()},
+            },
+        }
+        drift = [reason for key, reason in _KNOWN_JS_DRIFT.items() if sim_kwargs.get(key)]
+        if drift:
+            entry["known_drift"] = "; ".join(drift)
+        corpus.append(entry)
+
+    with open(path, "w") as f:
+        json.dump(corpus, f, indent=1)
+    return corpus
 
 
 # =========================
@@ -858,15 +2962,76 @@ if __name__ == "__main__":
     
     print("\n📦 YOUR TOKEN POSITIONS:")
     for token in result['token_results']:
-        print(f"   {token['name']}: {token['user_yt']:,.2f} YT @ ${token['entry_price']:.4f} (Day {token['entry_day']})")
+        if token['user_yt'] > 0:
+            print(f"   {token['name']}: {token['user_yt']:,.2f} YT @ ${token['entry_price']:.4f} (Day {token['entry_day']})")
+        else:
+            print(f"   {token['name']}: ⚠️  ${token['unfilled_usd']:,.2f} order not filled (Day {token['entry_day']})")
+        if token['user_yt'] > 0 and token['unfilled_usd'] > 0:
+            print(f"      ⚠️  ${token['unfilled_usd']:,.2f} of the spend could not be filled")
     
     print("\n💰 AIRDROP VALUES AT DIFFERENT FDVs:")
     for fdv, val in result["airdrop_values"].items():
         roi = result["roi_per_fdv"][fdv]
-        print(f"   FDV ${fdv/1e6:.0f}M → ${val:,.2f} (ROI: {roi*100:.2f}%)")
+        roi_text = f"{roi*100:.2f}%" if roi is not None else "n/a, nothing spent"
+        print(f"   FDV ${fdv/1e6:.0f}M → ${val:,.2f} (ROI: {roi_text})")
     
     # Run timing sweep if enabled
-    if RUN_TIMING_SWEEP:
+    if RUN_TIMING_SWEEP and TIMING_SWEEP_STREAMING:
+        print("\n" + "=" * 70)
+        print("🔍 RUNNING TIMING SWEEP (STREAMING)...")
+        print("=" * 70)
+
+        sweep_params = dict(
+            airdrop_pct=AIRDROP_PCT,
+            total_supply=TOTAL_SUPPLY,
+            duration_days=POINTS_PROGRAM_DURATION_DAYS,
+            tvl_mode=TVL_MODE,
+            tvl_initial=TVL_INITIAL,
+            tvl_final=TVL_FINAL,
+            tvl_average=TVL_AVERAGE,
+            pendle_mode=PENDLE_MODE,
+            pendle_share_initial=PENDLE_SHARE_INITIAL,
+            pendle_share_final=PENDLE_SHARE_FINAL,
+            pendle_share_mode=PENDLE_SHARE_MODE,
+            pendle_share_average=None,
+            base_multiplier_pendle=BASE_MULTIPLIER_PENDLE,
+            base_multiplier_direct=BASE_MULTIPLIER_DIRECT,
+            token_configs=TOKEN_CONFIGS if PENDLE_MODE == "by_tokens" else None,
+            user_yt_tokens=USER_YT_TOKENS,
+            time_weighting=TIME_WEIGHTING,
+            fdv_list=FDV_LIST,
+            entry_days=ENTRY_DAYS_TO_TEST,
+            network_points_total=NETWORK_POINTS_TOTAL,
+        )
+        if TIMING_SWEEP_CHECKPOINT_DIR:
+            progress = run_sharded_sweep(
+                sweep_params, TIMING_SWEEP_CHECKPOINT_DIR,
+                days_per_shard=TIMING_SWEEP_SHARD_DAYS,
+                workers=TIMING_SWEEP_WORKERS,
+            )
+            print(f"   💾 Shards: {progress['completed']} run, {progress['skipped']} resumed "
+                  f"from {TIMING_SWEEP_CHECKPOINT_DIR}")
+            sweep_chunks = iter_sharded_sweep(TIMING_SWEEP_CHECKPOINT_DIR)
+        else:
+            sweep_chunks = iter_timing_sweep(**sweep_params)
+        sweep_summary = reduce_timing_sweep(sweep_chunks, top_k=5)
+
+        for target_fdv in FDV_LIST:
+            print(f"\n📈 TOP 5 ENTRY DAYS FOR FDV ${target_fdv/1e6:.0f}M:")
+            stats = sweep_summary.get(target_fdv)
+            if stats is None:
+                print(f"   No data available for FDV ${target_fdv/1e6:.0f}M")
+                continue
+            print(f"{'Day':<6} {'YT Price':<12} {'ROI':<12} {'Profitable?':<12} {'Future Days':<15}")
+            print("-" * 70)
+            for row in stats["top"]:
+                print(f"{row['entry_day']:<6} ${row['yt_price_avg']:<11.5f} {row['roi']*100:<11.2f}% {'Yes' if row['is_profitable'] else 'No':<12} {row['future_profitable_days']:<15}")
+            if stats["top"]:
+                print(f"\n   💡 Breakeven YT price: ${stats['top'][0]['breakeven_price']:.5f}")
+                print(f"   📉 Breakeven range: ${stats['breakeven_min']:.5f} – ${stats['breakeven_max']:.5f}")
+                print(f"   📊 Profitable entry days: {stats['profitable_days']}/{stats['entry_days']}")
+
+    elif RUN_TIMING_SWEEP:
         if not PANDAS_AVAILABLE:
             print("\n⚠️  TIMING SWEEP SKIPPED: pandas not installed")
             print("   Install with: pip install pandas")
@@ -921,6 +3086,194 @@ if __name__ == "__main__":
             
             print("\n💾 Full timing sweep data saved in 'sweep_df' variable")
             print("   Access with: sweep_df.xs(100_000_000, level='fdv') for FDV $100M")
+
+    # Network model shared by the schedule sweep and the web export
+    network_model = build_network_model(
+        duration_days=POINTS_PROGRAM_DURATION_DAYS,
+        tvl_mode=TVL_MODE,
+        tvl_initial=TVL_INITIAL,
+        tvl_final=TVL_FINAL,
+        tvl_average=TVL_AVERAGE,
+        pendle_mode=PENDLE_MODE,
+        pendle_share_initial=PENDLE_SHARE_INITIAL,
+        pendle_share_final=PENDLE_SHARE_FINAL,
+        pendle_share_mode=PENDLE_SHARE_MODE,
+        pendle_share_average=None,
+        base_multiplier_pendle=BASE_MULTIPLIER_PENDLE,
+        base_multiplier_direct=BASE_MULTIPLIER_DIRECT,
+        token_configs=TOKEN_CONFIGS if PENDLE_MODE == "by_tokens" else None,
+        network_points_total=NETWORK_POINTS_TOTAL,
+    )
+
+    # Run schedule sweep if enabled
+    if RUN_SCHEDULE_SWEEP and PANDAS_AVAILABLE:
+        print("\n" + "=" * 70)
+        print("🗓️  RUNNING SCHEDULE SWEEP...")
+        print("=" * 70)
+
+        for token_cfg in USER_YT_TOKENS:
+            schedules, specs = build_schedule_grid(
+                POINTS_PROGRAM_DURATION_DAYS,
+                token_cfg["spend_usd"],
+                mode=SCHEDULE_SWEEP_MODE,
+                thresholds=SCHEDULE_THRESHOLDS,
+                yt_prices=_build_token_price_path(network_model["days"], token_cfg),
+            )
+            schedule_df = schedule_sweep_for_token(
+                network_model, token_cfg, schedules, specs,
+                airdrop_pct=AIRDROP_PCT,
+                total_supply=TOTAL_SUPPLY,
+                time_weighting=TIME_WEIGHTING,
+                fdv_list=FDV_LIST,
+            )
+            print(f"\n🪙 {token_cfg.get('name', 'YT')}: {len(specs)} candidate schedules")
+            for target_fdv in FDV_LIST:
+                top5 = schedule_df.xs(target_fdv, level="fdv").nlargest(5, "roi")
+                print(f"\n📈 TOP 5 SCHEDULES FOR FDV ${target_fdv/1e6:.0f}M:")
+                print(f"{'Start':<7} {'End':<7} {'Avg Price':<12} {'Spent':<12} {'ROI':<12}")
+                print("-" * 70)
+                for _, row in top5.iterrows():
+                    print(f"{row['start_day']:<7} {row['end_day']:<7} ${row['yt_price_avg']:<11.5f} ${row['cost']:<11,.2f} {row['roi']*100:<11.2f}%")
+
+    # Size vs. entry day for tokens with a liquidity model
+    if POSITION_SIZES and PANDAS_AVAILABLE:
+        for token_cfg in USER_YT_TOKENS:
+            if not token_cfg.get("liquidity"):
+                continue
+            print("\n" + "=" * 70)
+            print(f"💧 POSITION SIZE SWEEP: {token_cfg.get('name', 'YT')}")
+            print("=" * 70)
+
+            size_df = position_size_sweep(
+                network_model, token_cfg, POSITION_SIZES,
+                airdrop_pct=AIRDROP_PCT,
+                total_supply=TOTAL_SUPPLY,
+                time_weighting=TIME_WEIGHTING,
+                fdv_list=FDV_LIST,
+                entry_days=ENTRY_DAYS_TO_TEST,
+            )
+            print(f"{'Spend':<14} {'Best Day':<10} {'Impact':<10} " + " ".join(f"{'ROI @' + f'{f/1e6:.0f}M':<12}" for f in FDV_LIST))
+            print("-" * 70)
+            for spend in POSITION_SIZES:
+                if spend not in size_df.index.get_level_values("spend_usd"):
+                    print(f"${spend:<13,.0f} unfillable on every entry day")
+                    continue
+                by_day = size_df.xs(spend, level="spend_usd")["roi"].unstack("fdv")
+                best_day = by_day[FDV_LIST[len(FDV_LIST) // 2]].idxmax()
+                impact = size_df.loc[(spend, best_day), "price_impact"].iloc[0]
+                rois = " ".join(f"{by_day.loc[best_day, f]*100:<11.2f}%" for f in FDV_LIST)
+                print(f"${spend:<13,.0f} {best_day:<10} {impact*100:<9.2f}% {rois}")
+
+    # Evaluate a probabilistic FDV if configured
+    if FDV_DISTRIBUTION is not None and PANDAS_AVAILABLE:
+        print("\n" + "=" * 70)
+        print(f"🎲 FDV DISTRIBUTION: {FDV_DISTRIBUTION.get('kind', 'lognormal')}")
+        print("=" * 70)
+
+        dist_df = fdv_distribution_sweep(
+            network_model, USER_YT_TOKENS,
+            airdrop_pct=AIRDROP_PCT,
+            total_supply=TOTAL_SUPPLY,
+            time_weighting=TIME_WEIGHTING,
+            fdv_distribution=FDV_DISTRIBUTION,
+            entry_days=ENTRY_DAYS_TO_TEST,
+        )
+        top5 = dist_df.nlargest(5, "expected_roi")
+        print(f"\n📈 TOP 5 ENTRY DAYS BY EXPECTED ROI:")
+        print(f"{'Day':<6} {'E[ROI]':<12} {'P(profit)':<12} {'ROI p05':<12} {'ROI p50':<12} {'ROI p95':<12}")
+        print("-" * 70)
+        for idx, row in top5.iterrows():
+            print(f"{idx:<6} {row['expected_roi']*100:<11.2f}% {row['p_profit']*100:<11.2f}% {row['roi_p05']*100:<11.2f}% {row['roi_p50']*100:<11.2f}% {row['roi_p95']*100:<11.2f}%")
+        print(f"\n   📊 Entry days with P(profit) > 50%: {int((dist_df['p_profit'] > 0.5).sum())}/{len(dist_df)}")
+
+    # Evaluate the multi-protocol portfolio if configured
+    if PORTFOLIO_PROGRAMS and PANDAS_AVAILABLE:
+        print("\n" + "=" * 70)
+        print(f"📂 PORTFOLIO: {len(PORTFOLIO_PROGRAMS)} POINTS PROGRAMS")
+        print("=" * 70)
+
+        portfolio_model = build_portfolio_model(PORTFOLIO_PROGRAMS, PORTFOLIO_FDV_SCENARIOS)
+        portfolio = evaluate_portfolio(portfolio_model)
+        calendar = portfolio_model["calendar"]
+        print(f"   Calendar: {calendar[0]} → {calendar[-1]} ({len(calendar)} days)")
+        print(f"   Total allocated: ${portfolio['total_allocated_usd']:,.2f}")
+
+        header = "".join(f"{'ROI ' + name:<14}" for name in portfolio_model["scenarios"])
+        print(f"\n{'Program':<16} {'Allocated':<14} {header}")
+        print("-" * 70)
+        for name, row in portfolio["per_protocol"].iterrows():
+            rois = "".join(f"{row['roi_' + s]*100:<12.2f}% " for s in portfolio_model["scenarios"])
+            print(f"{name:<16} ${row['allocation_usd']:<13,.0f} {rois}")
+        rois = "".join(f"{portfolio['aggregate_roi'][s]*100:<12.2f}% " for s in portfolio_model["scenarios"])
+        print("-" * 70)
+        print(f"{'AGGREGATE':<16} ${portfolio['total_allocated_usd']:<13,.0f} {rois}")
+
+    # Fit TVL path and multipliers to observed points if provided
+    if CALIBRATION_NETWORK_POINTS or CALIBRATION_WALLETS:
+        print("\n" + "=" * 70)
+        print("🎯 CALIBRATION")
+        print("=" * 70)
+
+        calibration = calibrate_network_model(
+            CALIBRATION_NETWORK_POINTS,
+            duration_days=POINTS_PROGRAM_DURATION_DAYS,
+            pendle_mode=PENDLE_MODE,
+            pendle_share_initial=PENDLE_SHARE_INITIAL,
+            pendle_share_final=PENDLE_SHARE_FINAL,
+            pendle_share_mode=PENDLE_SHARE_MODE,
+            pendle_share_average=None,
+            base_multiplier_pendle=BASE_MULTIPLIER_PENDLE,
+            base_multiplier_direct=BASE_MULTIPLIER_DIRECT,
+            token_configs=TOKEN_CONFIGS if PENDLE_MODE == "by_tokens" else None,
+            tvl_initial=TVL_INITIAL,
+            tvl_final=TVL_FINAL,
+            tvl_average=TVL_AVERAGE,
+            wallet_points=CALIBRATION_WALLETS,
+            tvl_mode=TVL_MODE,
+        )
+        params = calibration["params"]
+        fit = calibration["fit"]
+        if "tvl_mode" in fit["fixed"]:
+            print("   TVL: kept as configured (does not affect points with constant component TVL)")
+        elif "tvl_initial" in fit["fixed"]:
+            if params["tvl_mode"] == "average":
+                print("   TVL shape: flat (level kept as configured)")
+            else:
+                print(f"   TVL shape: {params['tvl_mode']}, final/initial "
+                      f"×{params['tvl_final'] / params['tvl_initial']:.2f} (level kept as configured)")
+        elif params["tvl_mode"] == "average":
+            print(f"   TVL: average ${params['tvl_average']:,.0f}")
+        else:
+            print(f"   TVL: {params['tvl_mode']} ${params['tvl_initial']:,.0f} → ${params['tvl_final']:,.0f}")
+        fmt = lambda m: f"{m:.3f}" if isinstance(m, (int, float)) else "schedule"
+        if PENDLE_MODE == "by_tokens":
+            for cfg in params["token_configs"]:
+                print(f"   {cfg.get('name', 'token')}: mult_yt_pendle {fmt(cfg.get('mult_yt_pendle', BASE_MULTIPLIER_PENDLE))}, "
+                      f"mult_direct {fmt(cfg.get('mult_direct', BASE_MULTIPLIER_DIRECT))}")
+        else:
+            print(f"   Multipliers: Pendle {fmt(params['base_multiplier_pendle'])}, direct {fmt(params['base_multiplier_direct'])}")
+        if fit["scaled"]:
+            print(f"   Scaled together ×{fit['common_scale']:.3f} (points cannot tell them apart): "
+                  f"{', '.join(fit['scaled'])}")
+        print(f"   Fitted network points: {calibration['network_model']['network_points']:,.0f}")
+        r2 = f"{fit['r2']:.4f}" if fit["r2"] is not None else "n/a"
+        print(f"   Fit: RMSE {fit['rmse_rel']*100:.2f}% (max {fit['max_rel_error']*100:.2f}%), R² {r2}, "
+              f"{fit['n_observations']} observations, {fit['n_candidates']} candidates")
+
+    # Export precomputed tables for the website if enabled
+    if EXPORT_WEB_TABLES:
+        header = export_lookup_table(
+            WEB_LOOKUP_TABLE_PATH, network_model, USER_YT_TOKENS,
+            airdrop_pct=AIRDROP_PCT,
+            total_supply=TOTAL_SUPPLY,
+            time_weighting=TIME_WEIGHTING,
+            fdv_grid=WEB_FDV_GRID,
+            tvl_levels=WEB_TVL_LEVELS,
+            multiplier_grid=WEB_MULTIPLIER_GRID,
+        )
+        corpus = export_golden_corpus(WEB_GOLDEN_CORPUS_PATH)
+        print(f"\n🌐 Lookup table {header['shape']} written to {WEB_LOOKUP_TABLE_PATH}")
+        print(f"   Parity corpus ({len(corpus)} cases) written to {WEB_GOLDEN_CORPUS_PATH}")
     
     print("\n" + "=" * 70)
     print("✅ CALCULATION COMPLETE!")
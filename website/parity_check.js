@@ -0,0 +1,58 @@
+// Parity check: compare calculator.js against the Python engine's golden corpus.
+// Regenerate the corpus with EXPORT_WEB_TABLES = True in pendleytairdropcalculator.py,
+// then run from this folder:  node parity_check.js [golden_corpus.json]
+
+const fs = require("fs");
+const path = require("path");
+const PendleCalculator = require("./calculator.js");
+
+const REL_TOL = 1e-9;
+
+function close(actual, expected) {
+    if (expected === null || actual === null) return actual === expected;
+    const scale = Math.max(Math.abs(expected), 1e-12);
+    return Math.abs(actual - expected) / scale <= REL_TOL;
+}
+
+const corpusPath = process.argv[2] || path.join(__dirname, "golden_corpus.json");
+const corpus = JSON.parse(fs.readFileSync(corpusPath, "utf-8"));
+const calculator = new PendleCalculator();
+
+let failures = 0;
+let knownDrift = 0;
+corpus.forEach((testCase, i) => {
+    const result = calculator.simulateAirdropUnified(testCase.config);
+    const expected = testCase.expected;
+    const mismatches = [];
+
+    ["network_points", "user_points", "user_share", "user_tokens"].forEach(key => {
+        if (!close(result[key], expected[key])) {
+            mismatches.push(`${key}: js=${result[key]} py=${expected[key]}`);
+        }
+    });
+    Object.entries(expected.roi_per_fdv).forEach(([fdv, roi]) => {
+        if (!close(result.roi_per_fdv[fdv], roi)) {
+            mismatches.push(`roi@${fdv}: js=${result.roi_per_fdv[fdv]} py=${roi}`);
+        }
+    });
+
+    const cfg = testCase.config;
+    const label = `case ${i} (${cfg.tvlMode}, ${cfg.pendleMode}, ${cfg.userYtTokens[0].yt_price_mode})`;
+    if (testCase.known_drift) {
+        // Expected to differ; flag it once calculator.js catches up
+        if (mismatches.length > 0) {
+            knownDrift++;
+            console.log(`DRIFT ${label}: ${testCase.known_drift}`);
+        } else {
+            console.log(`NOW MATCHES ${label} - drop known_drift: ${testCase.known_drift}`);
+        }
+    } else if (mismatches.length > 0) {
+        failures++;
+        console.log(`FAIL ${label}`);
+        mismatches.forEach(m => console.log(`    ${m}`));
+    }
+});
+
+console.log(`${corpus.length - failures - knownDrift}/${corpus.length} cases match the Python engine` +
+    (knownDrift > 0 ? ` (${knownDrift} known drift)` : ""));
+process.exit(failures > 0 ? 1 : 0);